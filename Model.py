@@ -4,11 +4,16 @@
 #
 #
 from exception import *
+from events import EventBus, ConsoleLogger
+from profiler import Profiler
+from watchdog import Watchdog
+from records.trajectory import Trajectory
 import numpy as np
 import timeit
-import copy
 import pickle
 import os
+import statistics
+import concurrent.futures
 
 
 class Evaluate(object):
@@ -18,8 +23,11 @@ class Evaluate(object):
 	def __init__(self, belong: 'GameModel'):
 		self._step = 0
 		self._time = 0
+		self._speed = 0
 		self._belong = belong
 		self._states = []
+		self._results = []
+		self._timeouts = []
 
 	def settime(self):
 		"""
@@ -45,10 +53,48 @@ class Evaluate(object):
 		"""
 		return self._step
 
-	def evamultitime(self, algorithm, times, maxdepth=None, maxrandom=None):
+	def setspeed(self, speed):
+		"""
+		Setting steps per second of the last run
+		"""
+		self._speed = speed
+
+	def getspeed(self):
+		"""
+		Getting steps per second of the last run
+		"""
+		return self._speed
+
+	def getresults(self):
+		"""
+		Getting results (True if win) of the last evamultitime
+		"""
+		return self._results
+
+	def gettimeouts(self):
+		"""
+		Getting steps of the decisions that timed out, per game of the last evamultitime
+		"""
+		return self._timeouts
+
+	def evamultitime(self, algorithm, times, maxdepth=None, maxrandom=None, headless=False, record=True,
+			profiler=None, workers=1, seeds=None, sink=None, timeout=None, fallback='remain', executor=None):
 		"""
 		Evaluate multiple times of one algorithms.
 		times : int: the number of evaluation
+		headless, record, profiler: see GameModel.run (headless also skips the summary,
+			getspeed() then gives the steps per second of all the runs)
+		workers: number of processes playing the games at most (1: all in this process).
+			Worker processes are headless and their events are not published here.
+		seeds: seed of each game (default: drawn from np.random when workers > 1);
+			the same seeds give the same games whatever the number of workers
+		sink: records.stream.GameStream writing every game as soon as it ends, instead of keeping
+			its states here (lst_states is then the states of the last games kept by the sink)
+		timeout, fallback: deadline of each decision, see GameModel.run (gettimeouts() gives the
+			steps that timed out in each game)
+		executor: concurrent.futures.ProcessPoolExecutor playing the games when workers > 1
+			(default: a new one for this call), to reuse one pool over several calls
+		The game is then played, whatever the number of workers: call reinitialize before running it again.
 		lst_time: lst of time
 		lst_result: lst of results
 		lst_actions: lst of actions
@@ -56,20 +102,55 @@ class Evaluate(object):
 		"""
 		if self._belong._isrun:
 			raise GameAlreadyRun()
+		if seeds is None and workers > 1:
+			seeds = np.random.randint(2 ** 31, size=times).tolist()
 		lst_time = []
 		lst_result = []
 		lst_steps = []
+		self._timeouts = []
 
-		for _ in range(times):
-			self._belong.reinitialize()
-			if 'expectimax' in algorithm.__name__:
-				result, time, steps, _, state = self._belong.run(algorithm, maxdepth, maxrandom)
-			else:
-				result, time, steps, _, state = self._belong.run(algorithm)
+		def keep(result, time, steps, state, seed):
 			lst_time.append(time)
 			lst_result.append(result)
 			lst_steps.append(steps)
-			self._states.append(copy.deepcopy(state))
+			if sink is not None:
+				sink.write(state, result, steps, time, seed)
+			else:
+				self._states.append(state)
+
+		if workers > 1:
+			game = self._belong
+			tasks = [(game._engine, game._height, game._width, game._num, seeds[i], algorithm, maxdepth, maxrandom,
+					record, profiler is not None, timeout, fallback) for i in range(times)]
+			own = executor is None
+			if own:
+				executor = concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, times, os.cpu_count() or 1))
+			try:
+				# map keeps the order of the games
+				for i, (result, time, steps, state, profile, timeouts) in enumerate(executor.map(_play_game, tasks)):
+					keep(result, time, steps, state, seeds[i])
+					self._timeouts.append(timeouts)
+					if profiler is not None:
+						profiler.games.extend(profile)
+			finally:
+				if own:
+					executor.shutdown()
+			# as after the games played here: reinitialize before the next evaluation
+			game._isrun = True
+		else:
+			for i in range(times):
+				self._belong.reinitialize(seeds[i] if seeds is not None else None)
+				result, time, steps, _, state = self._belong.run(algorithm, maxdepth, maxrandom, headless, record,
+						profiler, timeout, fallback)
+				keep(result, time, steps, state, self._belong._space.rng_seed)
+				self._timeouts.append(self._belong.getTimeoutsStatistic())
+
+		self._results = lst_result
+		states = self._states if sink is None else list(sink.recent)
+		# runs return step indexes: a game of index n played n + 1 steps
+		self._speed = (sum(lst_steps) + len(lst_steps)) / sum(lst_time)
+		if headless:
+			return lst_time, lst_steps, states
 
 		print('-' * 30)
 		print('---Multi-time Evaluation---')
@@ -78,13 +159,132 @@ class Evaluate(object):
 		print(f'List of steps: {[(i, lst_steps[i]) for i in range(len(lst_steps))]}')
 		print(f'Mean time: {sum(lst_time) / len(lst_time) :.4f} seconds.')
 		print(f'Mean steps: {sum(lst_steps) / len(lst_steps) :.2f} steps.')
+		print(f'Steps per second: {self._speed :.1f}')
+		print('-' * 30)
+
+		return lst_time, lst_steps, states
+
+	def evacompare(self, algorithms, times, seeds=None, maxdepth=None, maxrandom=None, headless=False, workers=1,
+			record=False):
+		"""
+		Evaluate several algorithms on the same games (common random numbers):
+		every algorithm plays the same seeds, so the same layouts and egg draws.
+		algorithms: list of algorithms (see GameModel.run)
+		times, seeds, maxdepth, maxrandom, headless, workers, record: see evamultitime
+		return dict algorithm name -> (lst_result, lst_steps)
+		"""
+		if seeds is None:
+			seeds = np.random.randint(2 ** 31, size=times).tolist()
+		seeds = list(seeds)[:times]
+		results = {}
+		for algorithm in algorithms:
+			name = algorithm.__name__
+			# a new game for every algorithm
+			self._belong.reinitialize()
+			_, lst_steps, _ = self.evamultitime(algorithm, len(seeds), maxdepth, maxrandom, True, record,
+					workers=workers, seeds=seeds)
+			results[name] = (list(self._results), lst_steps)
+		if headless:
+			return results
+
+		print('-' * 30)
+		print('---Paired Evaluation---')
+		for name, (lst_result, lst_steps) in results.items():
+			print(f'{name}: {sum(lst_result)}/{len(lst_result)} wins, mean steps {np.mean(lst_steps) :.2f}')
+		names = list(results)
+		for other in names[1:]:
+			# same games: the noise of the layouts cancels in the differences
+			diff = np.array(results[other][1]) - np.array(results[names[0]][1])
+			error = diff.std(ddof=1) / np.sqrt(len(diff)) if len(diff) > 1 else float('nan')
+			print(f'{other} - {names[0]}: {diff.mean() :+.2f} steps (standard error {error :.2f})')
+		print('-' * 30)
+
+		return results
+
+	@staticmethod
+	def intervals(lst_result, lst_steps, confidence=0.95):
+		"""
+		Confidence intervals (low, high) of the win rate (Wilson score) and of the mean steps (normal)
+		"""
+		n = len(lst_result)
+		z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+		p = sum(lst_result) / n
+		center = (p + z * z / (2 * n)) / (1 + z * z / n)
+		half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+		mean = float(np.mean(lst_steps))
+		error = z * np.std(lst_steps, ddof=1) / np.sqrt(n) if n > 1 else float('inf')
+		return (float(center - half), float(center + half)), (float(mean - error), float(mean + error))
+
+	def evasequential(self, algorithm, win_width=0.2, steps_width=5.0, confidence=0.95, min_games=5,
+			max_games=1000, max_time=None, maxdepth=None, maxrandom=None, headless=False, workers=1, seeds=None):
+		"""
+		Evaluate one algorithm until the confidence intervals are narrow enough:
+		games are played (<workers> at a time) until the interval of the win rate is at most
+		<win_width> wide and the one of the mean steps at most <steps_width> steps,
+		or until <max_games> games or <max_time> seconds.
+		confidence: level of the intervals
+		min_games: games played before the first test
+		seeds: seeds of the games in order (default: drawn from np.random), e.g. the same for
+			several algorithms (common random numbers, see evacompare)
+		return dict: games, win_rate, win_interval, mean_steps, steps_interval,
+			stop ('converged', 'max_games' or 'max_time')
+		"""
+		if seeds is None:
+			seeds = np.random.randint(2 ** 31, size=max_games).tolist()
+		seeds = list(seeds)[:max_games]
+		start = timeit.default_timer()
+		lst_result, lst_steps = [], []
+		stop = 'max_games'
+		# one pool of worker processes for all the batches
+		executor = concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1)) \
+				if workers > 1 else None
+		try:
+			while len(lst_result) < len(seeds):
+				batch = seeds[len(lst_result):len(lst_result) + max(workers, 1)]
+				# a new game for every batch
+				self._belong.reinitialize()
+				_, steps, _ = self.evamultitime(algorithm, len(batch), maxdepth, maxrandom, True, False,
+						workers=workers, seeds=batch, executor=executor)
+				lst_result += self._results
+				lst_steps += steps
+				if len(lst_result) >= min_games:
+					win, mean = self.intervals(lst_result, lst_steps, confidence)
+					if win[1] - win[0] <= win_width and mean[1] - mean[0] <= steps_width:
+						stop = 'converged'
+						break
+				if max_time is not None and timeit.default_timer() - start >= max_time:
+					stop = 'max_time'
+					break
+		finally:
+			if executor is not None:
+				executor.shutdown()
+
+		self._results = lst_result
+		win, mean = self.intervals(lst_result, lst_steps, confidence)
+		report = {
+			'games': len(lst_result),
+			'win_rate': sum(lst_result) / len(lst_result),
+			'win_interval': win,
+			'mean_steps': float(np.mean(lst_steps)),
+			'steps_interval': mean,
+			'stop': stop,
+		}
+		if headless:
+			return report
+
+		print('-' * 30)
+		print('---Sequential Evaluation---')
+		print(f'Games played: {report["games"]} (stop: {stop})')
+		print(f'Win rate: {report["win_rate"] :.3f}, {confidence :.0%} interval [{win[0] :.3f}, {win[1] :.3f}]')
+		print(f'Mean steps: {report["mean_steps"] :.2f}, {confidence :.0%} interval [{mean[0] :.2f}, {mean[1] :.2f}]')
 		print('-' * 30)
 
-		return lst_time, lst_steps, self._states
+		return report
 
 	def saveGame(self, filename):
 		"""
-		Save data for multiple trials game.
+		Save data for multiple trials game: list of the figures of each game
+		(np.array of int8, shape (steps, height, width)) in data/<filename>_multi.pickle
 		"""
 		if not len(self._states):
 			raise GameNotRun('Game does not run yet.') 
@@ -93,12 +293,14 @@ class Evaluate(object):
 		os.makedirs('data', exist_ok= True)
 		FILENAME = os.path.join('data', f'{filename}_multi.pickle')
 		with open(FILENAME, 'wb') as f:
-			pickle.dump(self._states, f)
+			# plain arrays: the file does not need records.trajectory to be read
+			pickle.dump([None if states is None else np.asarray(states) for states in self._states], f)
 
 		print(f'Your data "{filename}_multi.pickle" has been saved successfully in data folder')
 
 
 class SpaceObject(object):
+	__slots__ = ('x', 'y', 'collided', 'label', 'belong')
 
 	def __init__(self, x: int = None, y: int = None, belong: 'Space' = None, label: str = None):
 		"""
@@ -130,8 +332,21 @@ class SpaceObject(object):
 	def move(self, dir=None):
 		pass
 
+	@classmethod
+	def restore(cls, x: int, y: int, belong: 'Space', label: str):
+		"""
+		Create an object at (x, y) without adding it to the space
+		(the space already counts it, e.g. when the space is cloned)
+		"""
+		obj = cls.__new__(cls)
+		SpaceObject.__init__(obj, x, y, belong, label)
+		return obj
+
 
 class SpaceShip(SpaceObject):
+	__slots__ = ('available', 'status')
+	# value of the object in Space.figure
+	value = 2
 
 	def __init__(self, x, y, belong: 'Space' = None,  label='Ship', available: bool = True):
 		"""
@@ -157,7 +372,7 @@ class SpaceShip(SpaceObject):
 			'remain': Do nothing
 		make an attack available in next step 
 		"""
-		self.belong.figure[self.x, self.y] -= 2
+		self.belong._unplace(self)
 		if dir in ['a', 'd', 'left', 'right', 'remain']:
 			if dir in ['left', 'a'] and self.y >= 1:
 				self.y -= 1
@@ -167,7 +382,7 @@ class SpaceShip(SpaceObject):
 		elif dir in ['shoot', 'w']:
 			self.attack()
 			self.available = not self.available
-		self.belong.figure[self.x, self.y] += 2
+		self.belong._place(self)
 
 	def attack(self):
 		"""
@@ -177,7 +392,7 @@ class SpaceShip(SpaceObject):
 		"""
 		if self.available:
 			# attack
-			_ = Bullet(self.x - 1, self.y, belong=self.belong)
+			_ = Bullet.spawn(self.x - 1, self.y, self.belong)
 		
 	def is_death(self):
 		"""
@@ -188,11 +403,36 @@ class SpaceShip(SpaceObject):
 		return not self.status
 
 	def up(self):
-		self.belong.figure[self.x, self.y] += 2
+		self.belong._place(self)
 		self.belong.spaceship = self
 
 
-class Bullet(SpaceObject):
+class Pooled(SpaceObject):
+	"""
+	Object kept in a free-list of its space when it leaves the game, to be reused
+		index: position of the object in its list of the space, None once removed (O(1) removal,
+			the list drops it at its next use, see Space._remove)
+	"""
+	__slots__ = ('index',)
+
+	@classmethod
+	def spawn(cls, x: int, y: int, belong: 'Space'):
+		"""
+		Create an object at (x, y) in <belong>, reusing a released one if any
+		"""
+		free = belong._free[cls]
+		if not free:
+			return cls(x, y, belong)
+		obj = free.pop()
+		obj.x, obj.y = x, y
+		obj.collided = False
+		obj.up()
+		return obj
+
+
+class Bullet(Pooled):
+	__slots__ = ()
+	value = 7
 
 	def __init__(self, x, y, belong: 'Space', label='Bullet'):
 		"""
@@ -206,26 +446,28 @@ class Bullet(SpaceObject):
 		bullet tries to move 2 upward
 		if collides with an invader, both invader and bullet disappear 
 		"""
-		self.belong.figure[self.x, self.y] -= 7 
+		self.belong._unplace(self)
 		if self.belong.figure[self.x-1, self.y] == 1:
 			self.x -= 1
 		else:
 			self.x -= 2
 
 		if self.x >= 0:
-			self.belong.figure[self.x, self.y] += 7			
+			self.belong._place(self)
 		else:
-			self.belong.bullets.remove(self)
+			self.belong._remove('bullets', self)
 			
 	def up(self):
 		"""
 		append the bullet to list of bullets where it belongs to when created
 		"""
-		self.belong.bullets.append(self)
-		self.belong.figure[self.x, self.y] += 7
+		self.belong._append('bullets', self)
+		self.belong._place(self)
 
 	
-class Egg(SpaceObject):
+class Egg(Pooled):
+	__slots__ = ()
+	value = 4
 
 	def __init__(self, x, y, belong: 'Space', label='Egg'):
 		"""
@@ -241,13 +483,13 @@ class Egg(SpaceObject):
 		if the egg is broken (do not collide with ship),
 		then remove from eggs list of space
 		"""
+		self.belong._unplace(self)
 		if not self.is_break():
-			self.belong.figure[self.x, self.y] -= 4
 			self.x += 1
-			self.belong.figure[self.x, self.y] += 4
+			self.belong._place(self)
 		else:
-			self.belong.figure[self.x, self.y] -= 4
-			self.belong.eggs.remove(self)
+			self.belong._emit('egg_broken', x=self.x, y=self.y)
+			self.belong._remove('eggs', self)
 
 	def is_break(self):
 		"""
@@ -261,11 +503,13 @@ class Egg(SpaceObject):
 		"""
 		append the egg to list of eggs of space where it belongs to when created
 		"""
-		self.belong.eggs.append(self)
-		self.belong.figure[self.x, self.y] += 4
+		self.belong._append('eggs', self)
+		self.belong._place(self)
 
 
 class Invader(SpaceObject):
+	__slots__ = ()
+	value = 1
 
 	def __init__(self, x, y, belong: 'Space', label="Invader"):
 		"""
@@ -279,7 +523,7 @@ class Invader(SpaceObject):
 		"""
 		invader drop an egg:'Egg'
 		"""
-		_ = Egg(self.x+1, self.y, belong=self.belong)
+		_ = Egg.spawn(self.x+1, self.y, self.belong)
 
 	def up(self):
 		"""
@@ -287,13 +531,64 @@ class Invader(SpaceObject):
 		where it belongs to when created
 		"""
 		self.belong.invaders.append(self)
-		self.belong.figure[self.x, self.y] += 1
+		self.belong._place(self)
 
 
-class Space(object):
+class RandomStreams(object):
+	"""
+	Random draws of a space from its own generators (not the global np.random):
+		layout_rng: layout of the invaders
+		eggs of step t: generator seeded by (rng_seed, t), so agents playing the same seed
+			get the same draws at the same step whatever they did before (common random numbers)
+		agent_rng: draws of searches (apply_invaders), which never change the game
+	"""
+	def seed(self, seed: int = None):
+		"""
+		Seed the streams (None: seed drawn from np.random, so np.random.seed still fixes the games)
+		"""
+		if seed is None:
+			seed = int(np.random.randint(2 ** 31))
+		self.rng_seed = seed
+		layout, agent = np.random.SeedSequence(seed).spawn(2)
+		self.layout_rng = np.random.default_rng(layout)
+		self.agent_rng = np.random.default_rng(agent)
+
+	def share_streams(self, other: 'RandomStreams'):
+		"""
+		Draw from the streams of <other> (copies of a space)
+		"""
+		self.rng_seed, self.layout_rng, self.agent_rng = other.rng_seed, other.layout_rng, other.agent_rng
+
+	def egg_rng(self, step: int = None):
+		"""
+		Generator of the eggs of <step> (default: the current step)
+		"""
+		return np.random.default_rng((self.rng_seed, 1, self.step if step is None else step))
+
+	def draw_layout(self):
+		"""
+		return sorted cells (index y * 2 + x) of the <num> invaders among the 2 first rows
+		"""
+		return sorted(self.layout_rng.choice(self.width * 2, self.num, replace=False))
+
+	def draw_laying(self, acting: int, rng=None):
+		"""
+		return sorted indexes of the invaders laying an egg: 1 to 3 of the <acting> ones
+		rng: generator to draw from (default: eggs of the current step)
+		"""
+		rng = rng if rng is not None else self.egg_rng()
+		new_egg_number = rng.integers(1, min([4, 1 + acting]))
+		return sorted(rng.choice(acting, new_egg_number, replace=False))
+
+
+class Space(RandomStreams):
 	"""
 	Environment Model for the game
 	"""
+	# figure values whose cells per column are counted as objects move: lone invader,
+	# lone bullet, bullet on an egg (the values of HD.heuristic)
+	COUNTED = (1, 7, 11)
+
 	def __init__(self, height: int, width: int):
 		"""
 		Environment for a space fight between invaders and our space ship
@@ -314,10 +609,297 @@ class Space(object):
 		self.num = 0
 		self.step = -1
 		self.spaceship = None
+		self._pending = {}
+		# released bullets / eggs, and number of undo records still open (nothing is
+		# released while a record may bring an object back)
+		self._free = {Bullet: [], Egg: []}
+		self._open = 0
+		# objects removed from eggs / bullets but still in the list (see _remove)
+		self._dead = {'eggs': 0, 'bullets': 0}
+		# events.EventBus of the game, if any (set by GameModel)
+		self.events = None
+		self.seed()
 		self.invaders = []
 		self.eggs = []
 		self.bullets = []
 		self.figure = np.zeros((self.height, self.width), dtype=int)
+		# (x, y) -> objects on that cell, None until needed (lazy clone)
+		self._cells = {}
+		# counters kept up to date by _place/_unplace (plain lists: numpy scalar writes are slow)
+		self._col_invaders = [0] * self.width
+		self._col_bullets = [0] * self.width
+		self._col_eggs = [0] * self.width
+		self._row_eggs = [0] * self.height
+		# figure value -> cells of each column holding it, for the values heuristics read
+		self._col_cells = {value: [0] * self.width for value in self.COUNTED}
+		# rows of the eggs of each column (row -> number of eggs), lowest of them
+		self._egg_rows = [{} for _ in range(self.width)]
+		self._lowest = [-1] * self.width
+
+	# Lists of a lazy clone are only built when they are used
+
+	@property
+	def invaders(self):
+		return self._invaders if self._invaders is not None else self._materialize('invaders')
+
+	@invaders.setter
+	def invaders(self, value):
+		self._invaders = value
+
+	@property
+	def eggs(self):
+		if self._eggs is None:
+			return self._materialize('eggs')
+		if self._dead['eggs']:
+			self._compact('eggs')
+		return self._eggs
+
+	@eggs.setter
+	def eggs(self, value):
+		self._eggs = value
+		self._dead['eggs'] = 0
+		self._renumber(value)
+
+	@property
+	def bullets(self):
+		if self._bullets is None:
+			return self._materialize('bullets')
+		if self._dead['bullets']:
+			self._compact('bullets')
+		return self._bullets
+
+	@bullets.setter
+	def bullets(self, value):
+		self._bullets = value
+		self._dead['bullets'] = 0
+		self._renumber(value)
+
+	@staticmethod
+	def _renumber(objects):
+		if objects is not None:
+			for i, obj in enumerate(objects):
+				obj.index = i
+
+	def _append(self, name: str, obj: Pooled):
+		objects = getattr(self, name)
+		obj.index = len(objects)
+		objects.append(obj)
+
+	def _remove(self, name: str, obj: Pooled):
+		"""
+		Remove <obj> from list <name> in O(1): it is only marked, the list drops the removed
+		objects in one go the next time it is used (see _compact)
+		"""
+		obj.index = None
+		self._dead[name] += 1
+		if not self._open:
+			self._free[type(obj)].append(obj)
+
+	def _compact(self, name: str):
+		"""
+		Drop the removed objects of list <name>, keeping the order of the others
+		(creation order, which searches use to break ties)
+		"""
+		setattr(self, name, [obj for obj in getattr(self, '_' + name) if obj.index is not None])
+
+	ENTITIES = {'invaders': (Invader, 'Invader'), 'eggs': (Egg, 'Egg'), 'bullets': (Bullet, 'Bullet')}
+
+	def _materialize(self, name: str):
+		"""
+		Build the list <name> of a lazy clone from its pending coordinates
+		"""
+		cls, label = self.ENTITIES[name]
+		objects = [cls.restore(x, y, self, label) for x, y in self._pending.pop(name)]
+		setattr(self, name, objects)
+		return objects
+
+	def _index(self):
+		"""
+		Return the cell index, built from the objects if needed
+		"""
+		if self._cells is None:
+			cells = {}
+			objects = [self.spaceship] if self.spaceship is not None else []
+			for obj in objects + self.invaders + self.eggs + self.bullets:
+				cells.setdefault((obj.x, obj.y), []).append(obj)
+			self._cells = cells
+		return self._cells
+
+	def _place(self, obj: SpaceObject):
+		"""
+		Count <obj> at its position: figure, cell index and counters
+		"""
+		if self._cells is not None:
+			self._cells.setdefault((obj.x, obj.y), []).append(obj)
+		self._count(obj, obj.value, 1)
+
+	def _unplace(self, obj: SpaceObject):
+		"""
+		Stop counting <obj> at its position: figure, cell index and counters
+		"""
+		if self._cells is not None:
+			objects = self._cells[obj.x, obj.y]
+			objects.remove(obj)
+			if not objects:
+				del self._cells[obj.x, obj.y]
+		self._count(obj, -obj.value, -1)
+
+	def _count(self, obj: SpaceObject, value: int, n: int):
+		"""
+		Add <value> to the figure and <n> to the counters of <obj> at its position
+		"""
+		x, y = obj.x, obj.y
+		figure = self.figure
+		old = figure.item(x, y)
+		figure[x, y] = old + value
+		cells = self._col_cells
+		if old in cells:
+			cells[old][y] -= 1
+		if old + value in cells:
+			cells[old + value][y] += 1
+		label = obj.label
+		if label == 'Invader':
+			self._col_invaders[y] += n
+		elif label == 'Bullet':
+			self._col_bullets[y] += n
+		elif label == 'Egg':
+			self._col_eggs[y] += n
+			self._row_eggs[x] += n
+			rows = self._egg_rows[y]
+			rows[x] = rows.get(x, 0) + n
+			if n > 0:
+				if x > self._lowest[y]:
+					self._lowest[y] = x
+			elif not rows[x]:
+				del rows[x]
+				if x == self._lowest[y]:
+					self._lowest[y] = max(rows, default=-1)
+
+	# Counters (new arrays, always up to date)
+
+	@property
+	def invaders_per_column(self):
+		"""
+		(np.array, shape(width,)) number of invaders in each column
+		"""
+		return np.array(self._col_invaders)
+
+	@property
+	def bullets_per_column(self):
+		"""
+		(np.array, shape(width,)) number of bullets flying in each column
+		"""
+		return np.array(self._col_bullets)
+
+	@property
+	def eggs_per_column(self):
+		"""
+		(np.array, shape(width,)) number of eggs in each column
+		"""
+		return np.array(self._col_eggs)
+
+	@property
+	def eggs_per_row(self):
+		"""
+		(np.array, shape(height,)) number of eggs in each row
+		"""
+		return np.array(self._row_eggs)
+
+	@property
+	def lowest_egg(self):
+		"""
+		(np.array, shape(width,)) row of the lowest egg of each column, -1 if none
+		"""
+		return np.array(self._lowest)
+
+	@property
+	def lone_invaders_per_column(self):
+		"""
+		(np.array, shape(width,)) number of invaders alone on their cell in each column (figure 1)
+		"""
+		return np.array(self._col_cells[1])
+
+	@property
+	def lone_bullets_per_column(self):
+		"""
+		(np.array, shape(width,)) number of bullets alone on their cell in each column (figure 7)
+		"""
+		return np.array(self._col_cells[7])
+
+	@property
+	def bullets_on_eggs_per_column(self):
+		"""
+		(np.array, shape(width,)) number of cells holding a bullet and an egg only in each column (figure 11)
+		"""
+		return np.array(self._col_cells[11])
+
+	def cells_per_column(self, value: int):
+		"""
+		(np.array, shape(width,)) number of cells of each column where figure is <value>
+		(kept up to date for the values of COUNTED, other values are counted in the figure)
+		"""
+		if value in self._col_cells:
+			return np.array(self._col_cells[value])
+		return (self.figure == value).sum(0)
+
+	def cells_in_row(self, x: int, value: int):
+		"""
+		(list) columns of the cells of row <x> where figure is <value>
+		"""
+		return [y for y, cell in enumerate(self.figure[x].tolist()) if cell == value]
+
+	def at(self, x: int, y: int, label: str = None):
+		"""
+		Return tuple of objects on cell (x, y), only those with <label> if given
+		"""
+		objects = self._index().get((x, y), ())
+		if label is not None:
+			return tuple(obj for obj in objects if obj.label == label)
+		return tuple(objects)
+
+	def clone(self, lazy: bool = False):
+		"""
+		Return an independent copy of the space (faster than copy.deepcopy):
+		only the figure and the coordinates of the objects are copied.
+		lazy: (bool) copy on write, the objects of a list are only created
+			when the copy uses that list (lists it never touches cost nothing)
+		"""
+		new = type(self).__new__(type(self))
+		new.height = self.height
+		new.width = self.width
+		new.num = self.num
+		new.step = self.step
+		new.figure = self.figure.copy()
+		new._cells = None
+		new._free = {Bullet: [], Egg: []}
+		new._open = 0
+		new._dead = {'eggs': 0, 'bullets': 0}
+		# copies are for search: they publish nothing
+		new.events = None
+		new.share_streams(self)
+		for name in ['_col_invaders', '_col_bullets', '_col_eggs', '_row_eggs', '_lowest']:
+			setattr(new, name, getattr(self, name).copy())
+		new._col_cells = {value: cells.copy() for value, cells in self._col_cells.items()}
+		new._egg_rows = [rows.copy() for rows in self._egg_rows]
+		ship = self.spaceship
+		new.spaceship = None
+		if ship is not None:
+			new.spaceship = SpaceShip.restore(ship.x, ship.y, new, ship.label)
+			new.spaceship.available = ship.available
+			new.spaceship.status = ship.status
+		new._pending = {}
+		for name, (cls, label) in self.ENTITIES.items():
+			if name in self._pending:
+				# never used by this space either: share its coordinates
+				coords = self._pending[name]
+			else:
+				coords = [(o.x, o.y) for o in getattr(self, name)]
+			if lazy:
+				new._pending[name] = coords
+				setattr(new, name, None)
+			else:
+				setattr(new, name, [cls.restore(x, y, new, label) for x, y in coords])
+		return new
 
 	def show(self):
 		"""
@@ -330,13 +912,14 @@ class Space(object):
 		Create <num> invaders satisfy restriction
 		num: number of invaders
 		"""
-		cal = sorted(np.random.choice(range(self.width * 2), self.num, replace=False))
+		cal = self.draw_layout()
 		for i in range(len(cal)):
 			Invader(cal[i] % 2, cal[i]//2, self)
 
-	def invader_actions(self):
+	def invader_actions(self, rng=None):
 		"""
 		Control actions of the invaders
+		rng: generator of the draws (default: eggs of the current step, see RandomStreams)
 		"""
 		acting_possible_invaders = []
 
@@ -347,10 +930,10 @@ class Space(object):
 		
 		if self.step % 3 == 0:
 			if len(acting_possible_invaders): 
-				new_egg_number = np.random.randint(1, min([4, 1 + len(acting_possible_invaders)]))
-				laying_invader = sorted(np.random.choice(range(len(acting_possible_invaders)), new_egg_number, replace=False))
+				laying_invader = self.draw_laying(len(acting_possible_invaders), rng)
 				for i in laying_invader:
 					acting_possible_invaders[i].lay()
+					self._emit('egg_laid', x=acting_possible_invaders[i].x + 1, y=acting_possible_invaders[i].y)
 
 	def initialize(self, num: int):
 		"""
@@ -377,18 +960,11 @@ class Space(object):
 		Return True if Agent defeated
 		else False (then continue game)
 		"""
-		for invader in self.invaders.copy():
-			for bullet in self.bullets.copy():
-				if bullet.collide(invader):
-					self.bullets.remove(bullet)
-					self.invaders.remove(invader)
+		self._shoot_down()
 
-					self.figure[bullet.x, bullet.y] -= 8
-
-		for egg in self.eggs.copy():
-			if self.spaceship.collide(egg):
-				print(f'collision occurs at x= {self.spaceship.x} , y ={self.spaceship.y}')
-				return True
+		if self.check_losing():
+			self._emit('ship_hit', x=self.spaceship.x, y=self.spaceship.y)
+			return True
 		return False
 
 	def check_winning(self):
@@ -403,79 +979,205 @@ class Space(object):
 		"""
 		Return True if a egg collides spaceship 
 		"""
-		result = False
-
-		for egg in self.eggs.copy():
-			if self.spaceship.collide(egg):
-				result = True
-
-		return result
+		ship = self.spaceship
+		return any(obj.label == 'Egg' for obj in self._index().get((ship.x, ship.y), ()))
 		
 	def update_bullet(self):
 		"""
 		Update bullets movement for the game
 		"""
-		for bullet in self.bullets.copy():	
+		# bullets leaving the board are only marked as removed until the pass is over
+		for bullet in self.bullets:
 			bullet.move()
 
-		for invader in self.invaders.copy():
-			for bullet in self.bullets.copy():
-				if bullet.collide(invader):
-					self.bullets.remove(bullet)
-					self.invaders.remove(invader)
-					self.figure[bullet.x, bullet.y] -= 8
+		return self._shoot_down()
+
+	def _shoot_down(self):
+		"""
+		Remove every invader together with the first bullet on its cell
+		return list of (index, invader) removed, index in invaders at removal
+		"""
+		killed = []
+		cells = self._index()
+		for bullet in self.bullets:
+			for invader in cells.get((bullet.x, bullet.y), ()):
+				if invader.label == 'Invader':
+					index = self.invaders.index(invader)
+					del self.invaders[index]
+					killed.append((index, invader))
+					self._unplace(bullet)
+					self._unplace(invader)
+					self._remove('bullets', bullet)
+					self._emit('bullet_hit', x=invader.x, y=invader.y)
+					break
+		return killed
+
+	def _emit(self, event: str, **data):
+		"""
+		Publish <event> on the event bus, unless a search is trying moves (open records)
+		"""
+		if self.events is not None and not self._open and event in self.events:
+			self.events.emit(event, **data)
 
 	def update_egg(self):
 		"""
 		Update eggs movement for the game
 		"""
-		for egg in self.eggs.copy():
+		for egg in self.eggs:
 			egg.drop()
 
+	def apply(self, action, newstep: bool = False):
+		"""
+		Play one turn in place: bullets advance (and collide), ship does <action>, eggs drop
+		newstep: count a new step first (as GameModel.run does)
+		return an undo record for Space.undo
+		"""
+		ship = self.spaceship
+		self._open += 1
+		record = ('turn', self.step, ship.y, ship.available,
+				  [(b, b.x) for b in self.bullets], [(e, e.x) for e in self.eggs])
+		if newstep:
+			self.step += 1
+		killed = self.update_bullet()
+		ship.move(action)
+		self.update_egg()
+		return record + (killed,)
+
+	def apply_invaders(self):
+		"""
+		Let the invaders act (lay eggs) in place
+		return an undo record for Space.undo
+		"""
+		n = len(self.eggs)
+		self._open += 1
+		# a search samples the eggs from its own stream
+		self.invader_actions(self.agent_rng)
+		return ('lay', n)
+
+	def undo(self, record):
+		"""
+		Restore exactly the state before the apply / apply_invaders that returned <record>
+		(records must be undone in reverse order)
+		"""
+		self._open -= 1
+		if record[0] == 'lay':
+			# the new eggs are the last ones, no record holds them
+			while len(self.eggs) > record[1]:
+				egg = self.eggs.pop()
+				self._unplace(egg)
+				self._free[Egg].append(egg)
+			return
+
+		_, step, ship_y, available, bullets, eggs, killed = record
+		ship = self.spaceship
+		for obj in self.bullets + self.eggs + [ship]:
+			self._unplace(obj)
+		# bullets shot since the record (not in it) are released
+		for bullet, _ in bullets:
+			bullet.index = None
+		for bullet in self.bullets:
+			if bullet.index is not None:
+				self._free[Bullet].append(bullet)
+
+		for index, invader in reversed(killed):
+			self.invaders.insert(index, invader)
+			self._place(invader)
+		self.bullets = [bullet for bullet, _ in bullets]
+		self.eggs = [egg for egg, _ in eggs]
+		for obj, x in bullets + eggs:
+			obj.x = x
+			self._place(obj)
+		ship.y = ship_y
+		ship.available = available
+		self._place(ship)
+		self.step = step
+
 				
+def _play_game(task):
+	"""
+	Play one game of Evaluate.evamultitime in a worker process
+	return result, time, steps, states, profiled games, steps of the decisions that timed out
+	"""
+	engine, height, width, num, seed, algorithm, maxdepth, maxrandom, record, profile, timeout, fallback = task
+	profiler = Profiler() if profile else None
+	game = GameModel(engine)
+	game.initialize(height, width, num, seed)
+	result, time, steps, _, states = game.run(algorithm, maxdepth, maxrandom, True, record, profiler, timeout, fallback)
+	return result, time, steps, states, profiler.games if profile else [], game.getTimeoutsStatistic()
+
+
+def _no_lap(phase=None):
+	"""
+	Stand-in for Profiler.lap when the game is not profiled
+	"""
+
+
 class GameModel(object):
 	"""
 	Main model of the game in order to : evaluate, environment, control the ship
 	"""
-	def __init__(self):
+	def __init__(self, engine=None, observe=True):
 		"""
 		Input:
+		engine: class of the environment (default: Space), e.g. engines.arrays.ArraySpace
+		observe: reset / step return the figure as observation (False: None, the driver reads getSpace(),
+			e.g. with engines.sparse.SparseSpace on big boards, whose figure is built on every read)
 		Variables
 		_space (SPACE)
 		_actions(list)
-		_states(list)
+		_states(records.trajectory.Trajectory): figures of the game
+		_timeouts(list): steps of the decisions that timed out
 		"""
+		self._engine = engine or Space
+		self._observe_figure = observe
+		# events.EventBus: subscribe to follow the games of this model
+		self.events = EventBus()
 		self._space = None
 		self._actions = []
 		self._states = []
+		self._timeouts = []
 		self._evaluate = Evaluate(self)
 		self._isinit = False
+		# game of step(): over (or not started)
+		self._done = True
 
-	def initialize(self, height, width, num):
+	def initialize(self, height, width, num, seed=None):
 		"""
 		Initialize the space
 		evaluate
+		seed: seed of the random streams of the space (None: drawn from np.random)
 		"""
 		# This part for evaluate
 		self._height = height
 		self._width = width
 		self._num = num
 		#
-		self._space = Space(height, width)
+		self._actions = []
+		self._states = Trajectory(height, width)
+		self._timeouts = []
+		self._space = self._engine(height, width)
+		self._space.events = self.events
+		if seed is not None:
+			self._space.seed(seed)
 		self._space.initialize(num)
 		self._isinit = True
 		self._isrun = False
 
-	def reinitialize(self):
+	def reinitialize(self, seed=None):
 		"""
 		Reinitialize the game in order to evaluate
+		seed: seed of the random streams of the space (None: drawn from np.random)
 		"""
 		if not self._isinit:
 			raise GameNotIni("Don't forget to initialize game before reinit.")
 			
 		self._actions = []
-		self._states = []
-		self._space = Space(self._height, self._width)
+		self._states = Trajectory(self._height, self._width)
+		self._timeouts = []
+		self._space = self._engine(self._height, self._width)
+		self._space.events = self.events
+		if seed is not None:
+			self._space.seed(seed)
 		self._space.initialize(self._num)
 		self._isrun = False
 
@@ -489,7 +1191,8 @@ class GameModel(object):
 		self._evaluate = Evaluate(self)
 		return self._evaluate
 	
-	def run(self, algorithm, maxdepth=None, maxrandom=None):
+	def run(self, algorithm, maxdepth=None, maxrandom=None, headless=False, record=True, profiler=None, timeout=None,
+			fallback='remain'):
 		"""
 		args:
 		algorithms: 
@@ -498,6 +1201,12 @@ class GameModel(object):
 			`` space: Space``
 			return an action
 		maxdepth and maxrandom for expectimax algorithms.
+		headless: no console output at all (for batch runs)
+		record: keep the figure of every step (states), needed by saveData / visualize_play
+		profiler: profiler.Profiler timing each phase of the loop (None: no timing)
+		timeout: seconds the algorithm has for each decision (None: no limit). The algorithm then runs in
+			a worker process (see watchdog.Watchdog), killed on timeout: <fallback> is played instead
+			(None: raise DecisionTimeout), and the step goes to getTimeoutsStatistic()
 		return: True if win else False
 		"""
 		if not self._isrun:
@@ -510,51 +1219,64 @@ class GameModel(object):
 		if space is None:
 			raise NotExistSpace("Don't forget to initialize game.")
 
+		events = self.events
+		if not headless:
+			console = ConsoleLogger()
+			console.attach(events)
+		watchdog = Watchdog(timeout, fallback) if timeout is not None else None
+		try:
+			result, time, steps = self._play(space, algorithm, maxdepth, maxrandom, record, profiler, watchdog)
+		finally:
+			if watchdog is not None:
+				watchdog.stop()
+			if not headless:
+				console.detach(events)
+
+		return result, time, steps, self._actions, self._states
+		
+	def _play(self, space, algorithm, maxdepth, maxrandom, record, profiler, watchdog=None):
+		"""
+		Game loop of run, publishing on self.events
+		return result, time, steps
+		"""
+		# lap(phase): time of the phase that just ended, lap(): skip (event callbacks)
+		lap = profiler.lap if profiler is not None else _no_lap
+
 		self._evaluate.settime()
 		self._evaluate.setstep(0)
 
-		self._states.append(copy.deepcopy(space.figure))
-		
-		print(space.figure)
-		print('-+-+'*20)
+		if record:
+			self._states.append(space.figure)
+		# the figure of an engine may be built on read: only for subscribers
+		if 'game_start' in self.events:
+			self.events.emit('game_start', figure=space.figure)
+		if profiler is not None:
+			profiler.start_game()
+
+		args = (maxdepth, maxrandom) if 'expectimax' in algorithm.__name__ else ()
 
 		# Start game
 
 		while True:
 			
-			space.step += 1
-			space.update_bullet()
-			print('Start algorithm.')
-			if 'expectimax' in algorithm.__name__:
-				temp = algorithm(space, maxdepth, maxrandom)
+			self._advance(space, lap)
+			if watchdog is None:
+				temp = algorithm(space, *args)
 			else:
-				temp = algorithm(space)
-
-			print(f'Step {space.step + 1}: Do ', end='')
-			print(f'You choose: {temp}')
-			
-			space.spaceship.move(temp)
-			# For evaluate
-			self._actions.append(temp)
-			self._evaluate.setstep(space.step)
-			###
-
-			space.update_egg()
-
-			if space.check_losing():
-				result = False
-				print('LOSING')
-				print(f'Collision occurs at x = {space.spaceship.x} , y = {space.spaceship.y}')
-				break
-
-			space.invader_actions()
-
-			if space.check_winning():
-				result = True
-				print('WINNING')
+				timeouts = len(watchdog.timeouts)
+				temp = watchdog.decide(algorithm, space, *args)
+				if len(watchdog.timeouts) > timeouts:
+					self._timeouts.append(space.step)
+					self.events.emit('decision_timeout', step=space.step, timeout=watchdog.timeout, action=temp)
+			lap('algorithm')
+
+			result = self._resolve(space, temp, lap)
+			if result is not None:
 				break
 
-			self._states.append(copy.deepcopy(space.figure))
+			if record:
+				self._states.append(space.figure)
+			lap('record')
 			# Just for testing
 			# print(f'Invaders: {[x.get_position() for x in space.invaders]}')
 			# print(f'Spaceship: {space.spaceship.get_position()}')
@@ -562,21 +1284,129 @@ class GameModel(object):
 			# print(f'Eggs: {[x.get_position() for x in space.eggs]}')
 			# print(heuristic(space))
 			################
-			# Display each step
-			space.show()
-			print('---'*10)
-		self._states.append(copy.deepcopy(space.figure))
+			if 'step_end' in self.events:
+				self.events.emit('step_end', step=space.step, figure=space.figure)
+			lap()
+		if record:
+			self._states.append(space.figure)
+		lap('record')
+
+		time, steps = self._finish(space, result)
+		return result, time, steps
 
-		# Display
+	def _advance(self, space, lap):
+		"""
+		Start a new step: bullets move, then the agent has to choose an action
+		"""
+		space.step += 1
+		space.update_bullet()
+		lap('update_bullet')
+		self.events.emit('step_start', step=space.step)
+		lap()
+
+	def _resolve(self, space, action, lap):
+		"""
+		Play <action> and the rest of the step
+		return True if win, False if lose, None if the game goes on
+		"""
+		self.events.emit('action_chosen', step=space.step, action=action)
+		lap()
+		
+		space.spaceship.move(action)
+		lap('move')
+		# For evaluate
+		self._actions.append(action)
+		self._evaluate.setstep(space.step)
+		###
 
+		space.update_egg()
+		lap('update_egg')
+
+		losing = space.check_losing()
+		lap('check_losing')
+		if losing:
+			self.events.emit('ship_hit', x=space.spaceship.x, y=space.spaceship.y)
+			return False
+
+		space.invader_actions()
+		lap('invader_actions')
+
+		winning = space.check_winning()
+		lap('check_winning')
+		if winning:
+			return True
+		return None
+
+	def _finish(self, space, result):
+		"""
+		Game over: speed and game_over event
+		return time, steps
+		"""
 		time = self._evaluate.gettime()
 		steps = self._evaluate.getstep()
+		self._evaluate.setspeed((steps + 1) / time)
+		self.events.emit('game_over', result=result, steps=steps + 1, time=time, speed=self._evaluate.getspeed(),
+				ship=space.spaceship.get_position())
+		return time, steps
 
-		print(f'Running time: {time}')
-		print(f'Number of steps: {steps + 1}')
+	# Step by step API, for external drivers (training, serving)
+
+	def reset(self, seed=None):
+		"""
+		Start a new game played with step(action)
+		seed: seed of the random streams of the game (None: the game set up by initialize / reinitialize
+			if it has not been played yet, else a new game drawn from np.random)
+		return observation: read-only figure, not copied (with Space: a view that follows the game),
+			None if the model does not observe
+		"""
+		if not self._isinit:
+			raise GameNotIni("Don't forget to initialize game before reset.")
+		if seed is not None or self._isrun:
+			self.reinitialize(seed)
+		self._isrun = True
+		self._done = False
+		self._evaluate.settime()
+		self._evaluate.setstep(0)
+		if 'game_start' in self.events:
+			self.events.emit('game_start', figure=self._space.figure)
+		self._advance(self._space, _no_lap)
+		return self._observe()
+
+	def step(self, action):
+		"""
+		Play <action> ('a', 'd', 'w', 'remain', ...) in the game started by reset
+		return observation, reward, done, info
+			reward: number of invaders shot down since the last observation
+			done: whether the game is over
+			info: dict step (number of steps played), result (True win / False lose / None)
+		"""
+		if self._done:
+			raise GameNotRun('Call reset() before step(), and again once the game is over.')
+		space = self._space
+		invaders = len(space.invaders)
+		result = self._resolve(space, action, _no_lap)
+		# before _advance counts the next step
+		played = space.step + 1
+		if result is None:
+			if 'step_end' in self.events:
+				self.events.emit('step_end', step=space.step, figure=space.figure)
+			self._advance(space, _no_lap)
+		else:
+			self._done = True
+			self._finish(space, result)
+		reward = invaders - len(space.invaders)
+		return self._observe(), reward, self._done, {'step': played, 'result': result}
+
+	def _observe(self):
+		if not self._observe_figure:
+			return None
+		figure = np.asarray(self._space.figure)
+		if not figure.flags.writeable:
+			return figure
+		view = figure.view()
+		view.flags.writeable = False
+		return view
 
-		return result, time, steps, self._actions, self._states
-		
 	def getStatesStatistic(self):
 		"""
 		Return list of states of the game
@@ -585,6 +1415,12 @@ class GameModel(object):
 			raise GameNotRun('Game does not run yet.') 
 		return self._states
 
+	def getTimeoutsStatistic(self):
+		"""
+		Return steps of the decisions that timed out (run with a timeout)
+		"""
+		return self._timeouts
+
 	def getActionsStatistic(self):
 		"""
 		Return list of actions
@@ -595,13 +1431,9 @@ class GameModel(object):
 
 	def saveData(self, filename):
 		"""
-		save data in pickle file in data
+		save the figures of the game in data/<filename>.npy (int8 array, shape (steps, height, width))
 		name = filename
 		"""
-		# Create data folder if not exists
-		os.makedirs('data', exist_ok= True)
-		FILENAME = os.path.join('data', f'{filename}.pickle')
-		with open(FILENAME, 'wb') as f:
-			pickle.dump(self.getStatesStatistic(), f)
+		self.getStatesStatistic().save(filename)
 
-		print(f'Your data "{filename}.pickle" has been saved successfully in data folder')
+		print(f'Your data "{filename}.npy" has been saved successfully in data folder')
@@ -3,7 +3,7 @@
 # Source code: Local Search Algorithm	
 #
 #
-import copy
+import numpy as np
 
 
 def local_search(space) -> str:
@@ -20,21 +20,16 @@ def possible_actions(space) -> list:
 	"""
 	pos_actions = []
 	actions = ['w', 'remain', 'a', 'd']
-	print(space.spaceship.available)
 	for act in actions:
-		new_space = copy.deepcopy(space)
-		print(f'action: {act}')
-		if (not new_space.spaceship.available) and act == 'w':
+		if (not space.spaceship.available) and act == 'w':
 			continue
-		new_space.update_bullet()
-		new_space.spaceship.move(act)
-		new_space.update_egg()
-		losing = new_space.check_losing()
-		is_losing = dangerous_state(new_space)
-		if losing or is_losing:
-			continue
-		else:
-			pos_actions.append((act, heuristic(new_space, act)))
+		# try the action in place then take it back
+		record = space.apply(act)
+		losing = space.check_losing()
+		is_losing = dangerous_state(space)
+		if not (losing or is_losing):
+			pos_actions.append((act, heuristic(space, act)))
+		space.undo(record)
 	pos_actions.sort(key=(lambda x: (x[1][0], x[1][1])))
 	return pos_actions
 
@@ -43,12 +38,14 @@ def heuristic(space, act: 'str'):
 	"""
 	Return heuristic value of action act
 	"""
-	fig = space.figure
 	_, ship_y = space.spaceship.get_position()
 	cost = {'w': 0, 'a': 3, 'd': 3, 'remain': 2}
-	alive_chicken = [max(list(fig[:, i]).count(1) - list(fig[:, i]).count(11) - list(fig[:, i]).count(7), 0) for i in range(space.width)]
+	# lone invaders of each column less lone bullets and bullets on eggs
+	ones, sevens, elevens = space.lone_invaders_per_column, space.lone_bullets_per_column, \
+		space.bullets_on_eggs_per_column
+	alive_chicken = list(np.maximum(ones - elevens - sevens, 0))
 	# check whether action 'w' of ship can kill an invader
-	if (list(fig[:, ship_y]).count(1) == list(fig[:, ship_y]).count(11) + list(fig[:, ship_y]).count(7)) and act == 'w':
+	if ones[ship_y] == elevens[ship_y] + sevens[ship_y] and act == 'w':
 		nearest_invader = 0
 	else:
 		# try except for case list of alive chicken all 0
@@ -67,12 +64,10 @@ def nearest_zero(space, i: int) -> int:
 	"""
 	Find nearest hole which ship can stay there to avoid egg after i steps
 	Return an int"""
-	fig = space.figure
 	ship_x, ship_y = space.spaceship.get_position()
-	row_raw = fig[ship_x - i][:]
-	row = [1 if row_raw[j] in [4, 11] else 0 for j in range(len(row_raw))]
-	# print(row)
-	ret = min([abs(ship_y - k) for k in range(len(row)) if row[k] == 0])
+	# eggs alone or under a bullet block their cell
+	blocked = set(space.cells_in_row(ship_x - i, 4) + space.cells_in_row(ship_x - i, 11))
+	ret = min([abs(ship_y - k) for k in range(space.width) if k not in blocked])
 	# print(f'nearest 0 of {i} row above is {ret}')
 	return ret
 
@@ -5,7 +5,6 @@
 #
 
 
-import copy
 import heapq
 
 
@@ -30,15 +29,20 @@ def greedy_bfs(space):
     cost_of_success_in_layer1 = 99
     cost_of_good_moves = 1
     cost_of_bad_moves = 1
+    # the figure of a state only holds the occupied cells: (x, y) -> value of the figure of Model.Space
+
+    def add(figure, x, y, value):
+        figure[x, y] = figure.get((x, y), 0) + value
+
     # changing environment function
     # eggs dropping
 
     def change_eggs(figure, eggs):
         next_egg = []
         for x, y in eggs:
-            figure[x][y] -= 4
-            if x + 1 < len(figure):
-                figure[x + 1][y] += 4
+            add(figure, x, y, -4)
+            if x + 1 < h:
+                add(figure, x + 1, y, 4)
                 next_egg.append((x + 1, y))
         return figure, next_egg
     # bullets moving
@@ -46,17 +50,17 @@ def greedy_bfs(space):
     def change_bullets(figure, invaders, bullets):
         next_bullet = []
         for x, y in bullets:
-            figure[x][y] -= 7
+            add(figure, x, y, -7)
             if (x - 1, y) in invaders:
-                figure[x - 1][y] -= 1
+                add(figure, x - 1, y, -1)
             elif (x - 2, y) in invaders:
-                figure[x - 2][y] -= 1
+                add(figure, x - 2, y, -1)
             else:
                 if x - 2 >= 0:
-                    figure[x - 2][y] += 7
+                    add(figure, x - 2, y, 7)
                     next_bullet.append((x - 2, y))
 
-        return figure, [(x, y) for x, y in invaders if figure[x][y] == 1], next_bullet
+        return figure, [(x, y) for x, y in invaders if figure[x, y] == 1], next_bullet
     # heuristic functions
 
     # 1.Success of bullet
@@ -64,7 +68,7 @@ def greedy_bfs(space):
     # if it is a efficient action, it will lose points since we want to minimize the heuristic point,
     # otherwise, it will get points
     def heuristic1(figure, current_y, point):
-        column = [figure[t][current_y] for t in range(h)]
+        column = [figure.get((t, current_y), 0) for t in range(h)]
         success_bullets = False
         failed_bullets = False
         success_in_layer1 = False
@@ -87,20 +91,17 @@ def greedy_bfs(space):
     # rather than the others
 
     def heuristic2(figure, previous_move, current_move, point):
-        invaders_columns = []
+        # invaders left in each column once the bullets flying there have hit
+        left = [0] * w
+        for (_, y), value in figure.items():
+            if value == 1:
+                left[y] += 1
+            elif value in [7, 11]:
+                left[y] -= 1
         # find the maximum number of invaders in 1 column
-        max_invaders = 0
-        for i in range(w):
-            col = [figure[k][i] for k in range(h)]
-            t = col.count(1) - col.count(7) - col.count(11)
-            if t > max_invaders:
-                max_invaders = t
-
-        for i in range(w):
-            col = [figure[k][i] for k in range(h)]
-            # looking for columns that has maximum invaders
-            if col.count(1) == col.count(7) + col.count(11) + max_invaders:
-                invaders_columns.append(i)
+        max_invaders = max(left + [0])
+        # looking for columns that has maximum invaders
+        invaders_columns = [i for i in range(w) if left[i] == max_invaders]
         try:
             # return True if the current action can lead the ship closer to the column
             good_move = min([abs(current_move - k) for k in invaders_columns]) <= min([abs(previous_move - k) for k in
@@ -111,23 +112,26 @@ def greedy_bfs(space):
 
         return point + cost_of_bad_moves * (1 - good_move) - cost_of_good_moves * good_move
 
-    # function that check if we reach the goal state
+    # function that check if we reach the goal state (cells 4 and 11 hold an egg)
 
-    def no_eggs_in_space(f1):
-        for i in range(len(f1)):
-            for j in range(len(f1[i])):
-                if f1[i][j] in [4, 11]:
-                    return False
+    def no_eggs_in_space(f1, eggs):
+        for x, y in eggs:
+            if f1[x, y] in [4, 11]:
+                return False
         return True
     # some variables of the environment
-    figure = list([list(i) for i in space.figure])
     invaders_positions = [(i.x, i.y) for i in space.invaders]
     eggs_positions = [(i.x, i.y) for i in space.eggs]
     bullets_positions = [(i.x, i.y) for i in space.bullets]
     ship_x, ship_y = space.spaceship.x, space.spaceship.y
     w, h = space.width, space.height
+    figure = {}
+    for cells, value in [(invaders_positions, 1), ([(ship_x, ship_y)], 2), (eggs_positions, 4),
+                         (bullets_positions, 7)]:
+        for x, y in cells:
+            add(figure, x, y, value)
     # check whether the ship shoot before
-    if figure[ship_x - 3][ship_y] in [7, 11]:
+    if figure.get(((ship_x - 3) % h, ship_y), 0) in [7, 11]:
         previous_state = ['w']
     else:
         previous_state = ['a or d or remain']
@@ -142,7 +146,7 @@ def greedy_bfs(space):
         # we do the rest which is egg dropping
         f, e = change_eggs(state.f, state.e)
         # check if we reach the terminal state
-        if no_eggs_in_space(f):
+        if no_eggs_in_space(f, e):
             if len(state.m) == 1:
                 # just for dealing with the first few steps which the states have the 'goal state property'
                 # in these case, we just shoot, then move, then shoot...
@@ -159,9 +163,9 @@ def greedy_bfs(space):
             for move in possible_moves:
                 # make copies
                 # temp stands for temporary
-                f_temp = copy.deepcopy(f)
-                i_temp = copy.deepcopy(state.i)
-                b_temp = copy.deepcopy(state.b)
+                f_temp = dict(f)
+                i_temp = list(state.i)
+                b_temp = list(state.b)
                 temp_point = state.h
                 temp_path = state.m
                 if move == 'a':
@@ -175,12 +179,12 @@ def greedy_bfs(space):
                 else:
                     temp_y = state.ship_y
                     if move == 'w':
-                        f_temp[h - 2][state.ship_y] += 7
+                        add(f_temp, h - 2, state.ship_y, 7)
                         b_temp.append((h - 2, state.ship_y))
                         temp_point = heuristic1(f_temp, state.ship_y, temp_point)
                 # move the ship in the grid
-                f_temp[h - 1][state.ship_y] -= 2
-                f_temp[h - 1][temp_y] += 2
+                add(f_temp, h - 1, state.ship_y, -2)
+                add(f_temp, h - 1, temp_y, 2)
                 temp_point = heuristic2(f_temp, state.ship_y, temp_y, temp_point)
                 # collision checking
                 if (h - 1, temp_y) not in e:
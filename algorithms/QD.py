@@ -3,34 +3,7 @@
 # Source code: Greedy BFS Algorithm	
 #
 #
-
-import copy
-
-def nextSpace(space, action, isAgent, isIStep):
-    """
-    Return the copy of the space if the agent or the chickens do an action
-    """
-    newspace = copy.deepcopy(space)
-    if isAgent:
-        if isIStep:
-            newspace.step += 1
-        for bullet in newspace.bullets.copy():
-            bullet.move()
-        for invader in newspace.invaders.copy():
-            for bullet in newspace.bullets.copy():
-                if bullet.collide(invader):
-                    newspace.bullets.remove(bullet)
-                    newspace.invaders.remove(invader)
-                    newspace.figure[bullet.x, bullet.y] -= 8
-
-        for egg in newspace.eggs.copy():
-            egg.drop()   
-        newspace.spaceship.move(action)
-    else:
-        
-        newspace.invader_actions()
-    return newspace
-
+import numpy as np
 
 ACTIONS = ['a', 'd', 'w', 'remain']
 
@@ -102,23 +75,10 @@ def expected_chicken(space):
     """
     Return the number total of will-die and die chickens
     """
-    ship, lstbullets, lstinvaders, lsteggs = getpositions(space)
-    actual_chicken = len(lstinvaders)
-    willdie_chicken = 0
-
-    for i in range(space.width):
-        chickens = 0
-        bullets = 0
-        for chicken in lstinvaders:
-            if chicken[1] == i:
-                chickens += 1
-        
-        for bullet in lstbullets:
-            if bullet[1] == i:
-                bullets += 1
-
-        willdie_chicken += min(chickens, bullets)
-    
+    actual_chicken = int(space.invaders_per_column.sum())
+    # a column with k invaders and b bullets loses min(k, b) of them
+    willdie_chicken = int(np.minimum(space.invaders_per_column, space.bullets_per_column).sum())
+
     return space.num - actual_chicken + willdie_chicken
 
 
@@ -162,12 +122,10 @@ def maxValue(space, depth, maxdepth, randomdepth):
     legal_actions = get_legal_actions(space)
 
     for action in legal_actions:
-        if not depth:
-            score, actions = expectedValue(nextSpace(space, action, isAgent=True, isIStep=False), depth, maxdepth,
-                                           randomdepth)
-        else:
-            score, actions = expectedValue(nextSpace(space, action, isAgent=True, isIStep=True), depth, maxdepth,
-                                           randomdepth)
+        # search in place: play the action, evaluate, then undo it
+        record = space.apply(action, newstep=bool(depth))
+        score, actions = expectedValue(space, depth, maxdepth, randomdepth)
+        space.undo(record)
         if score > max_score:
             max_score = score
             max_score_actions = [action] + actions
@@ -190,8 +148,9 @@ def expectedValue(space, depth, maxdepth, randomdepth):
         rd = randomdepth
 
     for _ in range(rd):
-        score, actions = maxValue(nextSpace(space, 'remain', isAgent=False, isIStep=True), depth + 1, maxdepth,
-                                  randomdepth)
+        record = space.apply_invaders()
+        score, actions = maxValue(space, depth + 1, maxdepth, randomdepth)
+        space.undo(record)
         expected_score += score / rd
 
     return expected_score, []
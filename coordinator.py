@@ -0,0 +1,224 @@
+#
+#
+# Evaluation over several hosts: a coordinator hands out games over TCP to
+# worker processes (any host that can import Model and algorithms), workers send
+# every result back as soon as it is played, and games of a lost worker are retried.
+#
+# Connections carry pickles: whoever holds the key can run code on the coordinator and
+# its workers. Keep the default bind to 127.0.0.1 unless every host of the network is trusted.
+#
+# Usage: python coordinator.py HOST PORT --authkey KEY   (start a worker)
+#
+#
+import argparse
+import queue
+import secrets
+import threading
+import multiprocessing
+from multiprocessing.connection import Listener, Client
+from Model import Space, _play_game
+
+
+def serve(address, authkey: bytes):
+	"""
+	Worker: play the games sent by the coordinator at <address> until it says stop
+	authkey: key of the coordinator
+	"""
+	conn = Client(address, authkey=authkey)
+	while True:
+		try:
+			task = conn.recv()
+		except EOFError:
+			return
+		if task is None:
+			conn.close()
+			return
+		try:
+			conn.send((True, _play_game(task)))
+		except Exception as error:
+			conn.send((False, repr(error)))
+
+
+class Coordinator(object):
+	"""
+	Hand out games to the workers connected to <address> (port 0: any free port, see address)
+		authkey: key the workers must give (None: a random one, printed)
+		failures: (dict) index of the game -> last error, for games failed more than <retries> times
+		results: (list) results (True if win) of the last evaluate, None for failed games
+	The algorithm is sent by reference: workers import it (module-level function of algorithms).
+	Usage:
+		with Coordinator(('127.0.0.1', 6000), authkey=b'...') as coordinator:
+			coordinator.start_local_workers(4)	# or: python coordinator.py HOST 6000 --authkey ... on other hosts
+			lst_time, lst_steps, lst_states = coordinator.evaluate(local_search, range(1000))
+	"""
+	def __init__(self, address=('127.0.0.1', 0), authkey: bytes = None, retries: int = 2):
+		if authkey is None:
+			authkey = secrets.token_hex(16).encode()
+			print(f'Coordinator authkey: {authkey.decode()}')
+		self._listener = Listener(address, authkey=authkey)
+		self.address = self._listener.address
+		self.authkey = authkey
+		self.retries = retries
+		self.failures = {}
+		self.results = []
+		self._tasks = queue.Queue()
+		self._results = {}
+		self._tries = {}
+		# number of the current map: results of games of an earlier one are dropped
+		self._generation = 0
+		self._finished = threading.Condition()
+		self._workers = 0
+		self._processes = []
+		threading.Thread(target=self._accept, daemon=True).start()
+
+	def _accept(self):
+		while True:
+			try:
+				conn = self._listener.accept()
+			except OSError:
+				# listener closed
+				return
+			except Exception:
+				# failed handshake (e.g. wrong authkey): ignore that client
+				continue
+			with self._finished:
+				self._workers += 1
+			threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+	def _handle(self, conn):
+		"""
+		Feed one worker, one game at a time
+		"""
+		while True:
+			item = self._tasks.get()
+			if item is None:
+				conn.send(None)
+				conn.close()
+				return
+			generation, index, task = item
+			try:
+				conn.send(task)
+				ok, answer = conn.recv()
+			except (EOFError, OSError):
+				# the worker is gone: its game goes to another one
+				with self._finished:
+					self._workers -= 1
+				self._fail(generation, index, task, 'worker lost')
+				conn.close()
+				return
+			if ok:
+				self._done(generation, index, answer)
+			else:
+				self._fail(generation, index, task, answer)
+
+	def _done(self, generation, index, answer):
+		with self._finished:
+			if generation == self._generation:
+				self._results[index] = answer
+				self._finished.notify_all()
+
+	def _fail(self, generation, index, task, error):
+		with self._finished:
+			if generation != self._generation:
+				return
+			self._tries[index] = self._tries.get(index, 0) + 1
+			if self._tries[index] > self.retries:
+				self.failures[index] = error
+				self._done(generation, index, None)
+			else:
+				self._tasks.put((generation, index, task))
+
+	def start_local_workers(self, n: int):
+		"""
+		Start <n> worker processes on this host
+		"""
+		host, port = self.address
+		for _ in range(n):
+			process = multiprocessing.Process(target=serve, args=((host, port), self.authkey), daemon=True)
+			process.start()
+			self._processes.append(process)
+
+	def map(self, tasks, deadline: float = 120.0):
+		"""
+		Play <tasks> (see Model._play_game) on the workers
+		deadline: seconds without any game finished (e.g. all the workers are gone) after which
+			the games left are played here, in this process (None: wait for the workers)
+		return their results in order (None for failed games, see failures)
+		"""
+		with self._finished:
+			self._generation += 1
+			generation = self._generation
+			self._results = {}
+			self._tries = {}
+			self.failures = {}
+		for index, task in enumerate(tasks):
+			self._tasks.put((generation, index, task))
+		with self._finished:
+			while len(self._results) < len(tasks):
+				finished = len(self._results)
+				if not self._finished.wait_for(lambda: len(self._results) > finished, deadline):
+					break
+			left = [i for i in range(len(tasks)) if i not in self._results]
+			if left:
+				# no worker got to them: results of the workers still playing them are dropped
+				self._generation += 1
+				while True:
+					try:
+						self._tasks.get_nowait()
+					except queue.Empty:
+						break
+			results = dict(self._results)
+		for index in left:
+			try:
+				results[index] = _play_game(tasks[index])
+			except Exception as error:
+				self.failures[index] = repr(error)
+				results[index] = None
+		return [results[i] for i in range(len(tasks))]
+
+	def evaluate(self, algorithm, seeds, height=9, width=7, num=14, engine=None, maxdepth=None, maxrandom=None,
+			record=False, timeout=None, fallback='remain', deadline: float = 120.0):
+		"""
+		Play one game of <algorithm> per seed, like Evaluate.evamultitime (results: see results)
+		deadline: see map
+		return lst_time, lst_steps, lst_states (None for failed games)
+		"""
+		tasks = [(engine or Space, height, width, num, seed, algorithm, maxdepth, maxrandom, record, False, timeout,
+				fallback) for seed in seeds]
+		games = [game or (None,) * 4 for game in self.map(tasks, deadline)]
+		self.results, lst_time, lst_steps, lst_states = ([game[i] for game in games] for i in range(4))
+		return lst_time, lst_steps, lst_states
+
+	def close(self):
+		"""
+		Stop the workers and the listener
+		"""
+		with self._finished:
+			workers = self._workers
+		for _ in range(workers):
+			self._tasks.put(None)
+		for process in self._processes:
+			process.join(1)
+			# not connected yet
+			if process.is_alive():
+				process.kill()
+		self._listener.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Worker playing the games of a coordinator.')
+	parser.add_argument('host')
+	parser.add_argument('port', type=int)
+	parser.add_argument('--authkey', required=True, help='key printed by the coordinator')
+	args = parser.parse_args()
+	serve((args.host, args.port), args.authkey.encode())
+
+
+if __name__ == '__main__':
+	main()
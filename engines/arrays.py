@@ -0,0 +1,572 @@
+#
+#
+# Struct-of-arrays engine: same rules as Model.Space, but every invader, egg
+# and bullet lives in preallocated numpy arrays with an alive mask.
+#
+#
+import numpy as np
+from Model import SpaceShip, Bullet, Egg, Invader, RandomStreams
+
+
+def ship_step(y: int, available: bool, dir, width: int):
+	"""
+	Rules of SpaceShip.move on plain values
+	return (y, available, fired)
+		fired: True if a bullet has to be created above the ship
+	"""
+	fired = False
+	if dir in ['a', 'd', 'left', 'right', 'remain']:
+		if dir in ['left', 'a'] and y >= 1:
+			y -= 1
+		elif dir in ['right', 'd'] and y < width - 1:
+			y += 1
+		available = True
+	elif dir in ['shoot', 'w']:
+		fired = available
+		available = not available
+	return y, available, fired
+
+
+class Pool(object):
+	"""
+	Preallocated coordinates of one kind of object
+		x, y: (np.array) coordinates, only the first <n> slots are used
+		alive: (np.array of bool) whether the slot holds a living object
+		views: (list) views of the living slots kept by the space; like the
+			slots of live(), dropped once an object is added or removed
+	Slots are handed out in creation order so that the living slots
+	keep the same order as the lists of Model.Space.
+	"""
+	def __init__(self, capacity: int):
+		capacity = max(capacity, 1)
+		self.x = np.zeros(capacity, dtype=int)
+		self.y = np.zeros(capacity, dtype=int)
+		self.alive = np.zeros(capacity, dtype=bool)
+		self.n = 0
+		self._changed()
+
+	def _changed(self):
+		self._live = None
+		self.views = None
+
+	def live(self):
+		"""
+		return slots of living objects in creation order (read-only)
+		"""
+		if self._live is None:
+			self._live = np.flatnonzero(self.alive[:self.n])
+		return self._live
+
+	def count(self):
+		return int(np.count_nonzero(self.alive[:self.n]))
+
+	def add(self, x, y):
+		"""
+		Append objects at positions x, y (int or arrays), return their slots
+		"""
+		x = np.atleast_1d(x)
+		y = np.atleast_1d(y)
+		if self.n + len(x) > len(self.alive):
+			self.compact()
+		if self.n + len(x) > len(self.alive):
+			self.grow(2 * (self.n + len(x)))
+		slots = np.arange(self.n, self.n + len(x))
+		self.x[slots] = x
+		self.y[slots] = y
+		self.alive[slots] = True
+		self.n += len(x)
+		self._changed()
+		return slots
+
+	def kill(self, slots):
+		if len(slots):
+			self.alive[slots] = False
+			self._changed()
+
+	def copy(self):
+		new = Pool.__new__(Pool)
+		new.x = self.x.copy()
+		new.y = self.y.copy()
+		new.alive = self.alive.copy()
+		new.n = self.n
+		new._live = self._live
+		new.views = None
+		return new
+
+	def compact(self):
+		"""
+		Move living objects to the front, keeping their order
+		"""
+		live = self.live()
+		k = len(live)
+		self.x[:k] = self.x[live]
+		self.y[:k] = self.y[live]
+		self.alive[:k] = True
+		self.alive[k:] = False
+		self.n = k
+		self._changed()
+
+	def grow(self, capacity: int):
+		for name in ['x', 'y', 'alive']:
+			old = getattr(self, name)
+			new = np.zeros(capacity, dtype=old.dtype)
+			new[:len(old)] = old
+			setattr(self, name, new)
+
+
+class Counters(object):
+	"""
+	Counters of Model.Space (invaders_per_column, ...) computed on read
+	from positions(label), which engines override with a read of their own storage
+	"""
+	LISTS = {'Invader': 'invaders', 'Egg': 'eggs', 'Bullet': 'bullets'}
+
+	def positions(self, label: str):
+		"""
+		return (xs, ys) arrays of the objects with <label> (default: from the object lists)
+		"""
+		objects = getattr(self, self.LISTS[label])
+		return np.array([obj.x for obj in objects], dtype=int), np.array([obj.y for obj in objects], dtype=int)
+
+	@property
+	def invaders_per_column(self):
+		return np.bincount(self.positions('Invader')[1], minlength=self.width)
+
+	@property
+	def bullets_per_column(self):
+		return np.bincount(self.positions('Bullet')[1], minlength=self.width)
+
+	@property
+	def eggs_per_column(self):
+		return np.bincount(self.positions('Egg')[1], minlength=self.width)
+
+	@property
+	def eggs_per_row(self):
+		return np.bincount(self.positions('Egg')[0], minlength=self.height)
+
+	@property
+	def lowest_egg(self):
+		xs, ys = self.positions('Egg')
+		lowest = np.full(self.width, -1)
+		np.maximum.at(lowest, ys, xs)
+		return lowest
+
+	def cells_per_column(self, value: int):
+		return (self.figure == value).sum(axis=0)
+
+	def cells_in_row(self, x: int, value: int):
+		return [y for y, cell in enumerate(self.figure[x].tolist()) if cell == value]
+
+	# Cells read by HD.heuristic (figure 1, 7 and 11), engines may count them without a figure
+
+	@property
+	def lone_invaders_per_column(self):
+		return self.cells_per_column(1)
+
+	@property
+	def lone_bullets_per_column(self):
+		return self.cells_per_column(7)
+
+	@property
+	def bullets_on_eggs_per_column(self):
+		return self.cells_per_column(11)
+
+
+class Publisher(object):
+	"""
+	Events of Model.Space (bullet_hit, egg_laid, egg_broken, ship_hit) published by an engine
+		events: events.EventBus of the game (set by GameModel), None: publish nothing
+	Nothing is published while a search is trying moves (_open: apply records not undone yet),
+	and copies publish nothing (clone resets both).
+	"""
+	events = None
+	_open = 0
+
+	def _listening(self, event: str):
+		"""
+		Whether <event> would be published (check it before computing its cells)
+		"""
+		return self.events is not None and not self._open and event in self.events
+
+	def _emit_cells(self, event: str, cells):
+		"""
+		Publish <event> once for each (x, y) of <cells>, if anyone listens
+		"""
+		if self._listening(event):
+			for x, y in cells:
+				self.events.emit(event, x=int(x), y=int(y))
+
+
+class ShipView(SpaceShip):
+	"""
+	SpaceShip API over the ship state of an engine
+	(engine must have ship_x, ship_y, available, status and move_ship(dir))
+	"""
+	def __init__(self, belong):
+		self.belong = belong
+		self.label = 'Ship'
+		self.collided = False
+
+	x = property(lambda self: self.belong.ship_x)
+	y = property(lambda self: self.belong.ship_y)
+
+	@property
+	def available(self):
+		return self.belong.available
+
+	@available.setter
+	def available(self, value):
+		self.belong.available = value
+
+	@property
+	def status(self):
+		return self.belong.status
+
+	def move(self, dir=None):
+		self.belong.move_ship(dir)
+
+	def attack(self):
+		if self.available:
+			self.belong.add_bullet(self.x - 1, self.y)
+
+	def up(self):
+		pass
+
+
+class _View(object):
+	"""
+	Live view of one slot of a Pool, used as SpaceObject
+	"""
+	pool = None
+
+	def __init__(self, belong: 'ArraySpace', slot: int):
+		self.belong = belong
+		self.slot = slot
+		self.collided = False
+
+	x = property(lambda self: int(getattr(self.belong, self.pool).x[self.slot]))
+	y = property(lambda self: int(getattr(self.belong, self.pool).y[self.slot]))
+
+	def __eq__(self, other):
+		return type(self) is type(other) and self.belong is other.belong and self.slot == other.slot
+
+	def __hash__(self):
+		return hash((id(self.belong), self.slot))
+
+	def up(self):
+		pass
+
+
+class InvaderView(_View, Invader):
+	pool = '_invaders'
+	label = 'Invader'
+
+	def lay(self):
+		self.belong.add_egg(self.x + 1, self.y)
+
+
+class BulletView(_View, Bullet):
+	pool = '_bullets'
+	label = 'Bullet'
+
+	def move(self):
+		self.belong.move_bullets(np.array([self.slot]))
+
+
+class EggView(_View, Egg):
+	pool = '_eggs'
+	label = 'Egg'
+
+	def drop(self):
+		self.belong.drop_eggs(np.array([self.slot]))
+
+
+class ArraySpace(Counters, Publisher, RandomStreams):
+	"""
+	Environment Model for the game, drop-in replacement of Model.Space
+	invaders, eggs, bullets are views rebuilt when objects come or go,
+	figure is derived from the coordinates when it is read.
+		_grid: (np.array, shape(height * width,)) figure without the bullets
+			(invaders, eggs and ship), kept up to date by every update
+	"""
+	def __init__(self, height: int, width: int):
+		self.height = height
+		self.width = width
+		self.num = 0
+		self.step = -1
+		self.ship_x = None
+		self.ship_y = None
+		self.available = True
+		self.status = True
+		self.spaceship = None
+		self.seed()
+		self._invaders = Pool(2 * width)
+		self._eggs = Pool(height * width)
+		self._bullets = Pool(height * width)
+		self._grid = np.zeros(height * width, dtype=int)
+		self._figure = None
+
+	@classmethod
+	def from_space(cls, space):
+		"""
+		Build an ArraySpace holding the same state as a Model.Space
+		"""
+		new = cls(space.height, space.width)
+		new.share_streams(space)
+		new.num = space.num
+		new.step = space.step
+		new.ship_x, new.ship_y = space.spaceship.get_position()
+		new.available = space.spaceship.available
+		new.status = space.spaceship.status
+		new.spaceship = ShipView(new)
+		for pool, objects in [(new._invaders, space.invaders), (new._eggs, space.eggs), (new._bullets, space.bullets)]:
+			if len(objects):
+				pool.add([o.x for o in objects], [o.y for o in objects])
+		new._grid = np.asarray(space.figure).ravel() - 7 * new._bincount(new._bullets)
+		return new
+
+	def clone(self, lazy: bool = False):
+		"""
+		Return an independent copy of the space (pools are copied, the
+		read-only figure is shared until one of them changes)
+		lazy: accepted for compatibility with Model.Space.clone
+		"""
+		new = type(self).__new__(type(self))
+		new.__dict__.update(self.__dict__)
+		new._invaders = self._invaders.copy()
+		new._eggs = self._eggs.copy()
+		new._bullets = self._bullets.copy()
+		new._grid = self._grid.copy()
+		new.spaceship = ShipView(new) if self.spaceship is not None else None
+		new.events, new._open = None, 0
+		return new
+
+	# Views
+
+	def positions(self, label: str):
+		pool = {'Invader': self._invaders, 'Egg': self._eggs, 'Bullet': self._bullets}[label]
+		live = pool.live()
+		return pool.x[live], pool.y[live]
+
+	def _views(self, pool: Pool, view: type):
+		if pool.views is None:
+			pool.views = [view(self, i) for i in pool.live().tolist()]
+		return pool.views
+
+	@property
+	def invaders(self):
+		return self._views(self._invaders, InvaderView)
+
+	@property
+	def eggs(self):
+		return self._views(self._eggs, EggView)
+
+	@property
+	def bullets(self):
+		return self._views(self._bullets, BulletView)
+
+	@property
+	def figure(self):
+		"""
+		Matrix of Model.Space built from the coordinates (read-only, cached until next change)
+		"""
+		if self._figure is None:
+			fig = (self._grid + 7 * self._bincount(self._bullets)).reshape(self.height, self.width)
+			fig.flags.writeable = False
+			self._figure = fig
+		return self._figure
+
+	def _bincount(self, pool: Pool):
+		"""
+		Number of living objects of <pool> on each cell, shape(height * width,)
+		"""
+		live = pool.live()
+		return np.bincount(pool.x[live] * self.width + pool.y[live], minlength=self.height * self.width)
+
+	def _mark(self, x, y, value: int):
+		"""
+		Add <value> to the cells (x, y) of _grid (ints or arrays)
+		"""
+		np.add.at(self._grid, np.asarray(x) * self.width + y, value)
+
+	def _changed(self):
+		self._figure = None
+
+	def show(self):
+		print(self.figure)
+
+	# Creation
+
+	def add_egg(self, x, y):
+		self._eggs.add(x, y)
+		self._mark(x, y, 4)
+		self._changed()
+
+	def add_bullet(self, x, y):
+		self._bullets.add(x, y)
+		self._changed()
+
+	def invaders_initialize(self):
+		"""
+		Create <num> invaders satisfy restriction (same draw as Model.Space)
+		"""
+		cal = np.array(self.draw_layout(), dtype=int)
+		self._invaders.add(cal % 2, cal // 2)
+		self._mark(cal % 2, cal // 2, 1)
+		self._changed()
+
+	def initialize(self, num: int):
+		self.num = num
+		self.ship_x, self.ship_y = self.height - 1, self.width // 2
+		self._mark(self.ship_x, self.ship_y, 2)
+		self.spaceship = ShipView(self)
+		self.invaders_initialize()
+
+	# Whole-array updates
+
+	def move_ship(self, dir=None):
+		y, self.available, fired = ship_step(self.ship_y, self.available, dir, self.width)
+		if fired:
+			self._bullets.add(self.ship_x - 1, self.ship_y)
+		if y != self.ship_y:
+			self._mark(self.ship_x, self.ship_y, -2)
+			self._mark(self.ship_x, y, 2)
+		self.ship_y = y
+		self._changed()
+
+	def move_bullets(self, slots):
+		"""
+		Bullet.move for the given slots:
+		go up 1 cell onto a lone invader, else 2 cells, disappear above the top
+		"""
+		b = self._bullets
+		above = (b.x[slots] - 1) % self.height
+		lone = self._grid[above * self.width + b.y[slots]] == 1
+		b.x[slots] -= np.where(lone, 1, 2)
+		b.kill(slots[b.x[slots] < 0])
+		self._changed()
+
+	def _shoot_down(self):
+		"""
+		Remove every invader together with the first bullet on its cell
+		"""
+		b, inv = self._bullets, self._invaders
+		bl = b.live()
+		# invaders never share a cell: odd cells of _grid hold one
+		if not len(bl) or not (self._grid[b.x[bl] * self.width + b.y[bl]] & 1).any():
+			return
+		il = inv.live()
+		cells, first = np.unique(b.x[bl] * self.width + b.y[bl], return_index=True)
+		icells = inv.x[il] * self.width + inv.y[il]
+		hit = np.isin(icells, cells)
+		if hit.any():
+			self._emit_cells('bullet_hit', zip(inv.x[il[hit]], inv.y[il[hit]]))
+			self._mark(inv.x[il[hit]], inv.y[il[hit]], -1)
+			inv.kill(il[hit])
+			b.kill(bl[first[np.searchsorted(cells, icells[hit])]])
+			self._changed()
+
+	def update_bullet(self):
+		"""
+		Update bullets movement for the game
+		"""
+		live = self._bullets.live()
+		if len(live):
+			self.move_bullets(live)
+		self._shoot_down()
+
+	def drop_eggs(self, slots):
+		"""
+		Egg.drop for the given slots: eggs on the bottom row break
+		"""
+		e = self._eggs
+		broken = e.x[slots] >= self.height - 1
+		self._emit_cells('egg_broken', zip(e.x[slots[broken]], e.y[slots[broken]]))
+		self._mark(e.x[slots], e.y[slots], -4)
+		e.kill(slots[broken])
+		e.x[slots[~broken]] += 1
+		self._mark(e.x[slots[~broken]], e.y[slots[~broken]], 4)
+		self._changed()
+
+	def update_egg(self):
+		"""
+		Update eggs movement for the game
+		"""
+		live = self._eggs.live()
+		if len(live):
+			self.drop_eggs(live)
+
+	def invader_actions(self, rng=None):
+		"""
+		Control actions of the invaders (same draw as Model.Space)
+		"""
+		inv = self._invaders
+		live = inv.live()
+		if not len(live):
+			return
+		x, y = inv.x[live], inv.y[live]
+		# the cell below is a lone invader if it holds one invader only and no bullet
+		below = (x + 1) * self.width + y
+		lone = self._grid[below] == 1
+		b = self._bullets
+		bl = b.live()
+		if lone.any() and len(bl):
+			bullets = set((b.x[bl] * self.width + b.y[bl]).tolist())
+			lone[lone] = [cell not in bullets for cell in below[lone].tolist()]
+		acting = np.flatnonzero(~lone)
+
+		if self.step % 3 == 0:
+			if len(acting):
+				laying_invader = acting[self.draw_laying(len(acting), rng)]
+				self.add_egg(x[laying_invader] + 1, y[laying_invader])
+				self._emit_cells('egg_laid', zip(x[laying_invader] + 1, y[laying_invader]))
+
+	# In-place search
+
+	def apply(self, action, newstep: bool = False):
+		"""
+		Play one turn in place (see Model.Space.apply), return an undo record
+		"""
+		record = ('turn', self.step, self.ship_y, self.available, self._invaders.copy(),
+				  self._eggs.copy(), self._bullets.copy(), self._grid.copy())
+		self._open += 1
+		if newstep:
+			self.step += 1
+		self.update_bullet()
+		self.move_ship(action)
+		self.update_egg()
+		return record
+
+	def apply_invaders(self):
+		record = ('lay', self.step, self.ship_y, self.available, None, self._eggs.copy(), None, self._grid.copy())
+		self._open += 1
+		self.invader_actions(self.agent_rng)
+		return record
+
+	def undo(self, record):
+		_, self.step, self.ship_y, self.available, invaders, eggs, bullets, self._grid = record
+		self._open -= 1
+		self._eggs = eggs
+		if invaders is not None:
+			self._invaders = invaders
+			self._bullets = bullets
+		self._changed()
+
+	# Terminal tests
+
+	def _ship_hit(self):
+		# ship (2) and invader (1) alone stay under 4: an egg is on the ship cell
+		return self._grid.item(self.ship_x * self.width + self.ship_y) >= 4
+
+	def check_collision(self):
+		self._shoot_down()
+		if self._ship_hit():
+			self._emit_cells('ship_hit', [(self.ship_x, self.ship_y)])
+			return True
+		return False
+
+	def check_winning(self):
+		return not self._invaders.count()
+
+	def check_losing(self):
+		return self._ship_hit()
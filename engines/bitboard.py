@@ -0,0 +1,232 @@
+#
+#
+# Bitboard engine for boards of at most 64 cells (the default board 9x7 has 63):
+# each layer (invaders, eggs, bullets) is one integer, cell (x, y) is bit x * width + y.
+#
+#
+import numpy as np
+from Model import SpaceObject, RandomStreams
+from engines.arrays import Counters, Publisher, ShipView, ship_step
+
+
+class BitSpace(Counters, Publisher, RandomStreams):
+	"""
+	Environment Model for the game, drop-in replacement of Model.Space on small boards
+		inv, egg, bul: (int) one bit per cell holding an invader / egg / bullet
+	Bullets and eggs move by shifting whole layers, collisions are AND of layers.
+	"""
+	def __init__(self, height: int, width: int):
+		if height * width > 64:
+			raise ValueError(f'Board {height}x{width} does not fit in 64 bits.')
+		self.height = height
+		self.width = width
+		self.num = 0
+		self.step = -1
+		self.inv = 0
+		self.egg = 0
+		self.bul = 0
+		self.ship_x = None
+		self.ship_y = None
+		self.available = True
+		self.status = True
+		self.spaceship = None
+		self.seed()
+		self.bottom = ((1 << width) - 1) << ((height - 1) * width)
+
+	def bit(self, x: int, y: int):
+		return 1 << int(x * self.width + y)
+
+	def cells(self, layer: int):
+		"""
+		return list of (x, y) of the bits set in <layer>, row by row
+		"""
+		result = []
+		while layer:
+			low = layer & -layer
+			result.append(divmod(low.bit_length() - 1, self.width))
+			layer ^= low
+		return result
+
+	@classmethod
+	def from_space(cls, space):
+		"""
+		Build a BitSpace holding the same state as a Model.Space
+		"""
+		new = cls(space.height, space.width)
+		new.share_streams(space)
+		new.num = space.num
+		new.step = space.step
+		new.ship_x, new.ship_y = space.spaceship.get_position()
+		new.available = space.spaceship.available
+		new.status = space.spaceship.status
+		new.spaceship = ShipView(new)
+		for name, objects in [('inv', space.invaders), ('egg', space.eggs), ('bul', space.bullets)]:
+			for o in objects:
+				setattr(new, name, getattr(new, name) | new.bit(o.x, o.y))
+		return new
+
+	def clone(self, lazy: bool = False):
+		new = type(self).__new__(type(self))
+		new.__dict__.update(self.__dict__)
+		new.spaceship = ShipView(new) if self.spaceship is not None else None
+		new.events, new._open = None, 0
+		return new
+
+	def key(self):
+		"""
+		Hashable state (e.g. for transposition tables)
+		"""
+		return self.inv, self.egg, self.bul, self.ship_y, self.available, self.step
+
+	# Views
+
+	def positions(self, label: str):
+		layer = {'Invader': self.inv, 'Egg': self.egg, 'Bullet': self.bul}[label]
+		cells = np.array(self.cells(layer), dtype=int).reshape(-1, 2)
+		return cells[:, 0], cells[:, 1]
+
+	@property
+	def invaders(self):
+		# same order as Model.Space: column by column
+		return [SpaceObject(x, y, self, 'Invader') for x, y in sorted(self.cells(self.inv), key=lambda c: (c[1], c[0]))]
+
+	@property
+	def eggs(self):
+		return [SpaceObject(x, y, self, 'Egg') for x, y in self.cells(self.egg)]
+
+	@property
+	def bullets(self):
+		return [SpaceObject(x, y, self, 'Bullet') for x, y in self.cells(self.bul)]
+
+	@property
+	def figure(self):
+		"""
+		Matrix of Model.Space built from the layers
+		"""
+		size = self.height * self.width
+		fig = np.zeros(size, dtype=int)
+		for layer, value in [(self.inv, 1), (self.egg, 4), (self.bul, 7)]:
+			bits = np.array([(layer >> i) & 1 for i in range(size)], dtype=int)
+			fig += value * bits
+		fig = fig.reshape(self.height, self.width)
+		if self.ship_x is not None:
+			fig[self.ship_x, self.ship_y] += 2
+		return fig
+
+	def show(self):
+		print(self.figure)
+
+	def _ship(self):
+		return self.bit(self.ship_x, self.ship_y) if self.ship_x is not None else 0
+
+	# Creation
+
+	def add_bullet(self, x, y):
+		self.bul |= self.bit(x, y)
+
+	def invaders_initialize(self):
+		"""
+		Create <num> invaders satisfy restriction (same draw as Model.Space)
+		"""
+		cal = self.draw_layout()
+		for c in cal:
+			self.inv |= self.bit(c % 2, c // 2)
+
+	def initialize(self, num: int):
+		self.num = num
+		self.ship_x, self.ship_y = self.height - 1, self.width // 2
+		self.spaceship = ShipView(self)
+		self.invaders_initialize()
+
+	# Layer updates
+
+	def move_ship(self, dir=None):
+		y, self.available, fired = ship_step(self.ship_y, self.available, dir, self.width)
+		if fired:
+			self.bul |= self.bit(self.ship_x - 1, self.ship_y)
+		self.ship_y = y
+
+	def update_bullet(self):
+		"""
+		Bullets go up 1 row onto a lone invader, else 2 rows (shifted out above the top),
+		then every bullet on an invader removes both
+		"""
+		w = self.width
+		lone = self.inv & ~self.egg & ~self._ship()
+		one = (self.bul >> w) & lone
+		two = (self.bul & ~(lone << w)) >> (2 * w)
+		bul = one | two
+		hit = bul & self.inv
+		if hit and self._listening('bullet_hit'):
+			self._emit_cells('bullet_hit', self.cells(hit))
+		self.inv &= ~hit
+		self.bul = bul & ~hit
+
+	def update_egg(self):
+		"""
+		Eggs on the bottom row break, the others drop 1 row
+		"""
+		broken = self.egg & self.bottom
+		if broken and self._listening('egg_broken'):
+			self._emit_cells('egg_broken', self.cells(broken))
+		self.egg = (self.egg & ~self.bottom) << self.width
+
+	def invader_actions(self, rng=None):
+		"""
+		Control actions of the invaders (same draw as Model.Space)
+		"""
+		lone = self.inv & ~self.egg & ~self.bul & ~self._ship()
+		acting = self.inv & ~(lone >> self.width)
+
+		if self.step % 3 == 0:
+			if acting:
+				acting = sorted(self.cells(acting), key=lambda c: (c[1], c[0]))
+				laying_invader = self.draw_laying(len(acting), rng)
+				for i in laying_invader:
+					x, y = acting[i]
+					self.egg |= self.bit(x + 1, y)
+					self._emit_cells('egg_laid', [(x + 1, y)])
+
+	# In-place search
+
+	def apply(self, action, newstep: bool = False):
+		"""
+		Play one turn in place (see Model.Space.apply), return an undo record
+		"""
+		record = (self.step, self.ship_y, self.available, self.inv, self.egg, self.bul)
+		self._open += 1
+		if newstep:
+			self.step += 1
+		self.update_bullet()
+		self.move_ship(action)
+		self.update_egg()
+		return record
+
+	def apply_invaders(self):
+		record = (self.step, self.ship_y, self.available, self.inv, self.egg, self.bul)
+		self._open += 1
+		self.invader_actions(self.agent_rng)
+		return record
+
+	def undo(self, record):
+		self.step, self.ship_y, self.available, self.inv, self.egg, self.bul = record
+		self._open -= 1
+
+	# Terminal tests
+
+	def check_collision(self):
+		hit = self.bul & self.inv
+		if hit and self._listening('bullet_hit'):
+			self._emit_cells('bullet_hit', self.cells(hit))
+		self.inv &= ~hit
+		self.bul &= ~hit
+		if self.check_losing():
+			self._emit_cells('ship_hit', [(self.ship_x, self.ship_y)])
+			return True
+		return False
+
+	def check_winning(self):
+		return not self.inv
+
+	def check_losing(self):
+		return bool(self.egg & self._ship())
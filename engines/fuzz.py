@@ -0,0 +1,204 @@
+#
+#
+# Differential fuzzing: play random games on Model.Space and on another engine
+# side by side and compare both (state and events published) after every phase of every step.
+#
+# Usage: python -m engines.fuzz [--games N] [engine ...]
+#   engine: module.Class, default: every engine of this folder
+#   (batched engines such as VectorSpace play all the games at once, one per slot)
+#
+#
+import argparse
+import importlib
+import random
+import numpy as np
+from Model import Space
+from events import EventBus
+
+
+ENGINES = ['engines.arrays.ArraySpace', 'engines.bitboard.BitSpace', 'engines.planes.PlaneSpace',
+		'engines.sparse.SparseSpace']
+BATCHED = ['engines.vector.VectorSpace']
+
+ACTIONS = ['a', 'd', 'w', 'remain', 'left', 'right', 'shoot', None]
+
+SIZES = [(9, 7), (8, 8), (6, 10), (5, 12), (12, 5)]
+
+# events published by the spaces themselves
+GAME_EVENTS = ['bullet_hit', 'egg_laid', 'egg_broken', 'ship_hit']
+
+
+def load(path: str):
+	"""
+	return the class named by 'module.Class'
+	"""
+	module, name = path.rsplit('.', 1)
+	return getattr(importlib.import_module(module), name)
+
+
+def state(space):
+	"""
+	Comparable state of any engine
+	"""
+	return (np.asarray(space.figure).tolist(), space.step, space.spaceship.get_position(), space.spaceship.available,
+			[o.get_position() for o in space.invaders],
+			sorted(o.get_position() for o in space.eggs),
+			sorted(o.get_position() for o in space.bullets))
+
+
+def record_events(space):
+	"""
+	Give <space> an event bus, return the list its game events go to: (event, x, y)
+	"""
+	log = []
+	space.events = EventBus()
+	for event in GAME_EVENTS:
+		space.events.subscribe(event, lambda x, y, event=event: log.append((event, x, y)))
+	return log
+
+
+def compare(space, other, where: str, logs=None):
+	"""
+	Raise AssertionError if the states differ, or the events published since the last compare
+	(logs: lists of record_events of both, emptied; order within a phase is free)
+	"""
+	a, b = state(space), state(other)
+	if a != b:
+		names = ['figure', 'step', 'ship', 'available', 'invaders', 'eggs', 'bullets']
+		diff = [names[i] for i in range(len(names)) if a[i] != b[i]]
+		raise AssertionError(f'{type(other).__name__} differs from Space at {where}: {diff}\n{a}\n{b}')
+	if logs is not None:
+		if sorted(logs[0]) != sorted(logs[1]):
+			raise AssertionError(f'{type(other).__name__} events differ from Space at {where}:\n{logs[0]}\n{logs[1]}')
+		for log in logs:
+			log.clear()
+
+
+def fuzz_game(engine, seed: int, height: int, width: int, num: int, steps: int = 300):
+	"""
+	Play one random game (seeded) on Space and <engine>, comparing after every phase
+	return number of steps played
+	"""
+	rnd = random.Random(seed)
+	space = Space(height, width)
+	space.seed(seed)
+	space.initialize(num)
+	other = engine.from_space(space)
+	compare(space, other, f'seed {seed} init')
+	logs = [record_events(space), record_events(other)]
+
+	for step in range(steps):
+		where = f'seed {seed} step {step}'
+		for s in [space, other]:
+			s.step += 1
+			s.update_bullet()
+		compare(space, other, where + ' update_bullet', logs)
+
+		action = rnd.choice(ACTIONS)
+		for s in [space, other]:
+			s.spaceship.move(action)
+			s.update_egg()
+		compare(space, other, where + f' move {action} / update_egg', logs)
+
+		losing = space.check_losing()
+		if losing != other.check_losing():
+			raise AssertionError(f'{type(other).__name__} check_losing differs at {where}')
+		if losing:
+			for s in [space, other]:
+				s.check_collision()
+			compare(space, other, where + ' check_collision', logs)
+			return step + 1
+
+		# both engines draw from the same streams (from_space shares them)
+		space.invader_actions()
+		other.invader_actions()
+		compare(space, other, where + ' invader_actions', logs)
+
+		if space.check_winning() != other.check_winning():
+			raise AssertionError(f'{type(other).__name__} check_winning differs at {where}')
+		if space.check_winning():
+			return step + 1
+	return steps
+
+
+def fuzz(engine, games: int = 200, seed: int = 0, sizes=None):
+	"""
+	Fuzz <engine> against Space on <games> random games of random sizes
+	return total number of compared steps, raise AssertionError on the first difference
+	"""
+	rnd = random.Random(seed)
+	total = 0
+	for game in range(games):
+		height, width = rnd.choice(sizes or SIZES)
+		num = rnd.randint(1, 2 * width)
+		total += fuzz_game(engine, seed + game, height, width, num)
+	return total
+
+
+def fuzz_batched(engine, games: int = 200, seed: int = 0, sizes=None, steps: int = 300):
+	"""
+	Fuzz a batched engine (VectorSpace) against Space: <games> random games of one board size
+	in as many slots, each compared with its Space after every step until it ends
+	return total number of compared steps, raise AssertionError on the first difference
+	"""
+	rnd = random.Random(seed)
+	height, width = rnd.choice(sizes or SIZES)
+	num = rnd.randint(1, 2 * width)
+	spaces = []
+	for game in range(games):
+		space = Space(height, width)
+		space.seed(seed + game)
+		space.initialize(num)
+		space.step += 1
+		space.update_bullet()
+		spaces.append(space)
+	other = engine.from_space(spaces)
+	playing = list(range(games))
+	total = 0
+	for step in range(steps):
+		if not playing:
+			break
+		actions = [rnd.choice(ACTIONS) for _ in range(games)]
+		_, done, win, played = other.step(actions)
+		for game in list(playing):
+			where = f'seed {seed + game} step {step}'
+			space = spaces[game]
+			space.spaceship.move(actions[game])
+			space.update_egg()
+			result = False if space.check_losing() else None
+			if result is None:
+				space.invader_actions()
+				result = True if space.check_winning() else None
+			if done[game] != (result is not None) or (result is not None and (win[game] != result
+					or played[game] != space.step + 1)):
+				raise AssertionError(f'{engine.__name__} ends differently from Space at {where} '
+						f'(game {game}: done {done[game]}, win {win[game]}, steps {played[game]}, Space {result})')
+			total += 1
+			if result is not None:
+				playing.remove(game)
+				continue
+			space.step += 1
+			space.update_bullet()
+			a = (np.asarray(space.figure).tolist(), space.step, space.spaceship.y, space.spaceship.available)
+			b = (other.figure[game].tolist(), int(other.turn[game]), int(other.ship_y[game]),
+					bool(other.available[game]))
+			if a != b:
+				raise AssertionError(f'{engine.__name__} game {game} differs from Space at {where}:\n{a}\n{b}')
+	return total
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Compare engines with Model.Space step for step.')
+	parser.add_argument('engines', nargs='*', default=ENGINES + BATCHED)
+	parser.add_argument('--games', type=int, default=200)
+	parser.add_argument('--seed', type=int, default=0)
+	args = parser.parse_args()
+
+	for path in args.engines:
+		run = fuzz_batched if path in BATCHED else fuzz
+		steps = run(load(path), args.games, args.seed)
+		print(f'{path}: {args.games} games, {steps} steps identical to Space')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,287 @@
+#
+#
+# Layered engine: the space is a boolean array of shape (layers, height, width),
+# one plane per kind of object, for any board size.
+# Kernels work on arrays of shape (..., layers, height, width) so that the same
+# code steps one game or a stack of games.
+#
+#
+import numpy as np
+from Model import SpaceObject, RandomStreams
+from engines.arrays import Counters, Publisher, ShipView, ship_step
+
+
+INVADER, SHIP, EGG, BULLET = range(4)
+
+# value of each layer in the additive figure of Model.Space
+VALUES = np.array([1, 2, 4, 7])
+
+
+def shift_up(plane, n: int = 1):
+	"""
+	return <plane> moved <n> rows up (rows leaving the board are dropped)
+	"""
+	result = np.zeros_like(plane)
+	if n < plane.shape[-2]:
+		result[..., :-n, :] = plane[..., n:, :]
+	return result
+
+
+def shift_down(plane, n: int = 1):
+	"""
+	return <plane> moved <n> rows down (rows leaving the board are dropped)
+	"""
+	result = np.zeros_like(plane)
+	if n < plane.shape[-2]:
+		result[..., n:, :] = plane[..., :-n, :]
+	return result
+
+
+def encode(planes):
+	"""
+	Additive figure of Model.Space (1 invader, 2 ship, 4 egg, 7 bullet), for visualization
+	"""
+	return np.tensordot(planes.astype(int), VALUES, axes=([-3], [0]))
+
+
+def decode(figure):
+	"""
+	Planes of an additive figure of Model.Space (one object of each kind per cell)
+	"""
+	figure = np.asarray(figure)
+	planes = np.zeros(figure.shape[:-2] + (4,) + figure.shape[-2:], dtype=bool)
+	rest = figure.copy()
+	for layer in [BULLET, EGG, SHIP, INVADER]:
+		planes[..., layer, :, :] = rest >= VALUES[layer]
+		rest = rest - VALUES[layer] * planes[..., layer, :, :]
+	return planes
+
+
+def advance_bullets(planes):
+	"""
+	Bullets go up 1 row onto a lone invader, else 2 rows, then every bullet
+	on an invader removes both. Works in place, return the cells hit.
+	"""
+	inv, egg, bul = planes[..., INVADER, :, :], planes[..., EGG, :, :], planes[..., BULLET, :, :]
+	lone = inv & ~egg & ~planes[..., SHIP, :, :]
+	moved = (shift_up(bul, 1) & lone) | shift_up(bul & ~shift_down(lone, 1), 2)
+	hit = moved & inv
+	inv &= ~hit
+	bul[...] = moved & ~hit
+	return hit
+
+
+def drop_eggs(planes):
+	"""
+	Eggs drop 1 row, the ones on the bottom row break. Works in place.
+	"""
+	planes[..., EGG, :, :] = shift_down(planes[..., EGG, :, :], 1)
+
+
+def acting_invaders(planes):
+	"""
+	Invaders that can lay: the cell below is not a lone invader
+	"""
+	lone = planes[..., INVADER, :, :] & ~planes[..., EGG, :, :] & ~planes[..., BULLET, :, :] & ~planes[..., SHIP, :, :]
+	return planes[..., INVADER, :, :] & ~shift_up(lone, 1)
+
+
+def ship_hit(planes):
+	"""
+	Whether an egg is on the ship
+	"""
+	return (planes[..., EGG, :, :] & planes[..., SHIP, :, :]).any(axis=(-2, -1))
+
+
+class PlaneSpace(Counters, Publisher, RandomStreams):
+	"""
+	Environment Model for the game, drop-in replacement of Model.Space
+		planes: (np.array of bool, shape(4, height, width)) one plane per
+			INVADER, SHIP, EGG, BULLET (at most one object of a kind per cell)
+	figure is only built when it is read (e.g. for visualization).
+	"""
+	def __init__(self, height: int, width: int):
+		self.height = height
+		self.width = width
+		self.num = 0
+		self.step = -1
+		self.planes = np.zeros((4, height, width), dtype=bool)
+		self.ship_x = None
+		self.ship_y = None
+		self.available = True
+		self.status = True
+		self.spaceship = None
+		self.seed()
+
+	@classmethod
+	def from_space(cls, space):
+		"""
+		Build a PlaneSpace holding the same state as a Model.Space
+		"""
+		new = cls(space.height, space.width)
+		new.share_streams(space)
+		new.num = space.num
+		new.step = space.step
+		new._place_ship(*space.spaceship.get_position())
+		new.available = space.spaceship.available
+		new.status = space.spaceship.status
+		new.spaceship = ShipView(new)
+		for layer, objects in [(INVADER, space.invaders), (EGG, space.eggs), (BULLET, space.bullets)]:
+			for o in objects:
+				new.planes[layer, o.x, o.y] = True
+		return new
+
+	def clone(self, lazy: bool = False):
+		new = type(self).__new__(type(self))
+		new.__dict__.update(self.__dict__)
+		new.planes = self.planes.copy()
+		new.spaceship = ShipView(new) if self.spaceship is not None else None
+		new.events, new._open = None, 0
+		return new
+
+	# Views
+
+	def positions(self, label: str):
+		return np.nonzero(self.planes[{'Invader': INVADER, 'Egg': EGG, 'Bullet': BULLET}[label]])
+
+	def _objects(self, layer: int, label: str):
+		# column by column, the order of Model.Space.invaders
+		return [SpaceObject(int(x), int(y), self, label) for y, x in np.argwhere(self.planes[layer].T)]
+
+	@property
+	def invaders(self):
+		return self._objects(INVADER, 'Invader')
+
+	@property
+	def eggs(self):
+		return self._objects(EGG, 'Egg')
+
+	@property
+	def bullets(self):
+		return self._objects(BULLET, 'Bullet')
+
+	@property
+	def figure(self):
+		return encode(self.planes)
+
+	# Counters of cells, from plane intersections (invaders never reach the ship's
+	# row, so figure 7 is a bullet alone)
+
+	@property
+	def lone_invaders_per_column(self):
+		inv, ship, egg, bul = self.planes
+		return (inv & ~ship & ~egg & ~bul).sum(axis=0)
+
+	@property
+	def lone_bullets_per_column(self):
+		inv, ship, egg, bul = self.planes
+		return (bul & ~inv & ~ship & ~egg).sum(axis=0)
+
+	@property
+	def bullets_on_eggs_per_column(self):
+		inv, ship, egg, bul = self.planes
+		return (bul & egg & ~inv & ~ship).sum(axis=0)
+
+	def cells_in_row(self, x: int, value: int):
+		return np.flatnonzero(np.dot(VALUES, self.planes[:, x]) == value).tolist()
+
+	def show(self):
+		print(self.figure)
+
+	# Creation
+
+	def _place_ship(self, x: int, y: int):
+		self.planes[SHIP] = False
+		self.planes[SHIP, x, y] = True
+		self.ship_x, self.ship_y = x, y
+
+	def add_bullet(self, x, y):
+		self.planes[BULLET, x, y] = True
+
+	def invaders_initialize(self):
+		"""
+		Create <num> invaders satisfy restriction (same draw as Model.Space)
+		"""
+		cal = np.array(self.draw_layout(), dtype=int)
+		self.planes[INVADER, cal % 2, cal // 2] = True
+
+	def initialize(self, num: int):
+		self.num = num
+		self._place_ship(self.height - 1, self.width // 2)
+		self.spaceship = ShipView(self)
+		self.invaders_initialize()
+
+	# Kernels
+
+	def move_ship(self, dir=None):
+		y, self.available, fired = ship_step(self.ship_y, self.available, dir, self.width)
+		if fired:
+			self.planes[BULLET, self.ship_x - 1, self.ship_y] = True
+		self._place_ship(self.ship_x, y)
+
+	def update_bullet(self):
+		hit = advance_bullets(self.planes)
+		if self._listening('bullet_hit'):
+			self._emit_cells('bullet_hit', np.argwhere(hit))
+
+	def update_egg(self):
+		if self._listening('egg_broken'):
+			self._emit_cells('egg_broken', [(self.height - 1, y) for y in np.flatnonzero(self.planes[EGG, -1])])
+		drop_eggs(self.planes)
+
+	def invader_actions(self, rng=None):
+		"""
+		Control actions of the invaders (same draw as Model.Space)
+		"""
+		acting = np.argwhere(acting_invaders(self.planes).T)
+
+		if self.step % 3 == 0:
+			if len(acting):
+				laying_invader = self.draw_laying(len(acting), rng)
+				y, x = acting[laying_invader].T
+				self.planes[EGG, x + 1, y] = True
+				self._emit_cells('egg_laid', zip(x + 1, y))
+
+	# In-place search
+
+	def apply(self, action, newstep: bool = False):
+		"""
+		Play one turn in place (see Model.Space.apply), return an undo record
+		"""
+		record = (self.step, self.ship_y, self.available, self.planes.copy())
+		self._open += 1
+		if newstep:
+			self.step += 1
+		self.update_bullet()
+		self.move_ship(action)
+		self.update_egg()
+		return record
+
+	def apply_invaders(self):
+		record = (self.step, self.ship_y, self.available, self.planes.copy())
+		self._open += 1
+		self.invader_actions(self.agent_rng)
+		return record
+
+	def undo(self, record):
+		self.step, self.ship_y, self.available, self.planes = record
+		self._open -= 1
+
+	# Terminal tests
+
+	def check_collision(self):
+		hit = self.planes[BULLET] & self.planes[INVADER]
+		if self._listening('bullet_hit'):
+			self._emit_cells('bullet_hit', np.argwhere(hit))
+		self.planes[INVADER] &= ~hit
+		self.planes[BULLET] &= ~hit
+		if self.check_losing():
+			self._emit_cells('ship_hit', [(self.ship_x, self.ship_y)])
+			return True
+		return False
+
+	def check_winning(self):
+		return not self.planes[INVADER].any()
+
+	def check_losing(self):
+		return bool(ship_hit(self.planes))
@@ -0,0 +1,299 @@
+#
+#
+# Sparse engine for very large boards: objects are kept as coordinates keyed
+# by column, so a step costs O(objects) and no height x width matrix is built
+# unless figure is read.
+#
+#
+import numpy as np
+from Model import SpaceObject, RandomStreams
+from engines.arrays import Counters, Publisher, ShipView, ship_step
+
+
+class SparseSpace(Counters, Publisher, RandomStreams):
+	"""
+	Environment Model for the game, drop-in replacement of Model.Space
+		inv, egg, bul: (dict) column -> frozenset of rows holding an invader / egg / bullet
+	The dicts and sets are never changed in place (a change builds new ones),
+	so copies of the space and undo records share them freely.
+	"""
+	def __init__(self, height: int, width: int):
+		self.height = height
+		self.width = width
+		self.num = 0
+		self.step = -1
+		self.inv = {}
+		self.egg = {}
+		self.bul = {}
+		self.ship_x = None
+		self.ship_y = None
+		self.available = True
+		self.status = True
+		self.spaceship = None
+		self.seed()
+
+	@classmethod
+	def from_space(cls, space):
+		"""
+		Build a SparseSpace holding the same state as a Model.Space
+		"""
+		new = cls(space.height, space.width)
+		new.share_streams(space)
+		new.num = space.num
+		new.step = space.step
+		new.ship_x, new.ship_y = space.spaceship.get_position()
+		new.available = space.spaceship.available
+		new.status = space.spaceship.status
+		new.spaceship = ShipView(new)
+		for name, objects in [('inv', space.invaders), ('egg', space.eggs), ('bul', space.bullets)]:
+			setattr(new, name, new._columns((o.x, o.y) for o in objects))
+		return new
+
+	@staticmethod
+	def _columns(cells):
+		"""
+		dict column -> frozenset of rows of the cells (x, y)
+		"""
+		columns = {}
+		for x, y in cells:
+			columns.setdefault(int(y), set()).add(int(x))
+		return {y: frozenset(xs) for y, xs in columns.items()}
+
+	def clone(self, lazy: bool = False):
+		new = type(self).__new__(type(self))
+		new.__dict__.update(self.__dict__)
+		new.spaceship = ShipView(new) if self.spaceship is not None else None
+		new.events, new._open = None, 0
+		return new
+
+	# Queries
+
+	def column(self, y: int):
+		"""
+		return rows of (invaders, eggs, bullets) in column y
+		"""
+		empty = frozenset()
+		return self.inv.get(y, empty), self.egg.get(y, empty), self.bul.get(y, empty)
+
+	def at(self, x: int, y: int, label: str = None):
+		"""
+		Return tuple of objects on cell (x, y), only those with <label> if given (as Model.Space.at)
+		"""
+		result = [SpaceObject(x, y, self, name) for name, layer in [('Invader', self.inv), ('Egg', self.egg),
+				('Bullet', self.bul)] if x in layer.get(y, ())]
+		if (x, y) == (self.ship_x, self.ship_y):
+			result.append(self.spaceship)
+		return tuple(obj for obj in result if label is None or obj.label == label)
+
+	def cells_per_column(self, value: int):
+		"""
+		(np.array, shape(width,)) number of cells of each column where figure is <value>,
+		from the occupied cells only (no height x width matrix)
+		"""
+		counts = [0] * self.width
+		empty = [self.height] * self.width
+		columns = set(self.inv) | set(self.egg) | set(self.bul)
+		if self.ship_x is not None:
+			columns.add(self.ship_y)
+		for y in columns:
+			inv, egg, bul = self.column(y)
+			rows = inv | egg | bul
+			if y == self.ship_y and self.ship_x is not None:
+				rows = rows | {self.ship_x}
+			empty[y] -= len(rows)
+			for x in rows:
+				cell = (x in inv) + 4 * (x in egg) + 7 * (x in bul) + 2 * ((x, y) == (self.ship_x, self.ship_y))
+				if cell == value:
+					counts[y] += 1
+		return np.array(empty if value == 0 else counts)
+
+	def cells_in_row(self, x: int, value: int):
+		"""
+		(list) columns of the cells of row <x> where figure is <value>, from the occupied cells only
+		"""
+		cells = {}
+		for layer, n in [(self.inv, 1), (self.egg, 4), (self.bul, 7)]:
+			for y, rows in layer.items():
+				if x in rows:
+					cells[y] = cells.get(y, 0) + n
+		if x == self.ship_x:
+			cells[self.ship_y] = cells.get(self.ship_y, 0) + 2
+		if value == 0:
+			return [y for y in range(self.width) if y not in cells]
+		return sorted(y for y, cell in cells.items() if cell == value)
+
+	def _lone_invader(self, x: int, y: int, bullets: bool):
+		"""
+		Whether figure[x, y] of Model.Space would be 1 (bullets counted or not)
+		"""
+		return (x in self.inv.get(y, ()) and x not in self.egg.get(y, ())
+				and not (bullets and x in self.bul.get(y, ())) and (x, y) != (self.ship_x, self.ship_y))
+
+	# Views
+
+	def positions(self, label: str):
+		layer = {'Invader': self.inv, 'Egg': self.egg, 'Bullet': self.bul}[label]
+		cells = np.array([(x, y) for y, xs in layer.items() for x in xs], dtype=int).reshape(-1, 2)
+		return cells[:, 0], cells[:, 1]
+
+	def _objects(self, layer: dict, label: str):
+		# column by column, the order of Model.Space.invaders
+		return [SpaceObject(x, y, self, label) for y in sorted(layer) for x in sorted(layer[y])]
+
+	@property
+	def invaders(self):
+		return self._objects(self.inv, 'Invader')
+
+	@property
+	def eggs(self):
+		return self._objects(self.egg, 'Egg')
+
+	@property
+	def bullets(self):
+		return self._objects(self.bul, 'Bullet')
+
+	@property
+	def figure(self):
+		"""
+		Matrix of Model.Space, built on every read: O(height * width), for renderers only
+		"""
+		fig = np.zeros((self.height, self.width), dtype=int)
+		for layer, value in [(self.inv, 1), (self.egg, 4), (self.bul, 7)]:
+			for y, xs in layer.items():
+				fig[list(xs), y] += value
+		if self.ship_x is not None:
+			fig[self.ship_x, self.ship_y] += 2
+		return fig
+
+	def show(self):
+		print(self.figure)
+
+	# Creation
+
+	def add_bullet(self, x, y):
+		self.bul = dict(self.bul)
+		self.bul[y] = self.bul.get(y, frozenset()) | {x}
+
+	def invaders_initialize(self):
+		"""
+		Create <num> invaders satisfy restriction (same draw as Model.Space)
+		"""
+		cal = self.draw_layout()
+		self.inv = self._columns((c % 2, c // 2) for c in cal)
+
+	def initialize(self, num: int):
+		self.num = num
+		self.ship_x, self.ship_y = self.height - 1, self.width // 2
+		self.spaceship = ShipView(self)
+		self.invaders_initialize()
+
+	# Updates, O(objects)
+
+	def move_ship(self, dir=None):
+		y, self.available, fired = ship_step(self.ship_y, self.available, dir, self.width)
+		if fired:
+			self.add_bullet(self.ship_x - 1, self.ship_y)
+		self.ship_y = y
+
+	def update_bullet(self):
+		"""
+		Bullets go up 1 row onto a lone invader, else 2 rows, then every bullet
+		on an invader removes both
+		"""
+		bul = {}
+		inv = self.inv
+		for y, xs in self.bul.items():
+			moved = set()
+			for x in xs:
+				x = x - 1 if self._lone_invader((x - 1) % self.height, y, bullets=False) else x - 2
+				if x >= 0:
+					moved.add(x)
+			hit = moved.intersection(inv.get(y, ()))
+			if hit:
+				self._emit_cells('bullet_hit', ((x, y) for x in hit))
+				if inv is self.inv:
+					inv = dict(inv)
+				inv[y] = inv[y] - hit
+				if not inv[y]:
+					del inv[y]
+				moved -= hit
+			if moved:
+				bul[y] = frozenset(moved)
+		self.bul = bul
+		self.inv = inv
+
+	def update_egg(self):
+		"""
+		Eggs drop 1 row, the ones on the bottom row break
+		"""
+		egg = {}
+		for y, xs in self.egg.items():
+			if self.height - 1 in xs:
+				self._emit_cells('egg_broken', [(self.height - 1, y)])
+			dropped = frozenset(x + 1 for x in xs if x < self.height - 1)
+			if dropped:
+				egg[y] = dropped
+		self.egg = egg
+
+	def invader_actions(self, rng=None):
+		"""
+		Control actions of the invaders (same draw as Model.Space)
+		"""
+		if self.step % 3 == 0:
+			acting = [(x, y) for y in sorted(self.inv) for x in sorted(self.inv[y])
+					if not self._lone_invader(x + 1, y, bullets=True)]
+			if len(acting):
+				laying_invader = self.draw_laying(len(acting), rng)
+				egg = dict(self.egg)
+				for i in laying_invader:
+					x, y = acting[i]
+					egg[y] = egg.get(y, frozenset()) | {x + 1}
+					self._emit_cells('egg_laid', [(x + 1, y)])
+				self.egg = egg
+
+	# In-place search
+
+	def apply(self, action, newstep: bool = False):
+		"""
+		Play one turn in place (see Model.Space.apply), return an undo record
+		"""
+		record = (self.step, self.ship_y, self.available, self.inv, self.egg, self.bul)
+		self._open += 1
+		if newstep:
+			self.step += 1
+		self.update_bullet()
+		self.move_ship(action)
+		self.update_egg()
+		return record
+
+	def apply_invaders(self):
+		record = (self.step, self.ship_y, self.available, self.inv, self.egg, self.bul)
+		self._open += 1
+		self.invader_actions(self.agent_rng)
+		return record
+
+	def undo(self, record):
+		self.step, self.ship_y, self.available, self.inv, self.egg, self.bul = record
+		self._open -= 1
+
+	# Terminal tests
+
+	def check_collision(self):
+		inv, bul = {}, {}
+		for y in set(self.inv) | set(self.bul):
+			hit = self.inv.get(y, frozenset()) & self.bul.get(y, frozenset())
+			self._emit_cells('bullet_hit', ((x, y) for x in hit))
+			for layer, old in [(inv, self.inv), (bul, self.bul)]:
+				if old.get(y, frozenset()) - hit:
+					layer[y] = old[y] - hit
+		self.inv, self.bul = inv, bul
+		if self.check_losing():
+			self._emit_cells('ship_hit', [(self.ship_x, self.ship_y)])
+			return True
+		return False
+
+	def check_winning(self):
+		return not self.inv
+
+	def check_losing(self):
+		return self.ship_x in self.egg.get(self.ship_y, ())
@@ -0,0 +1,171 @@
+#
+#
+# Batched environment: N independent games stacked in one boolean array
+# of shape (N, layers, height, width) and stepped together with the kernels
+# of engines.planes.
+#
+#
+import numpy as np
+from engines.planes import INVADER, SHIP, EGG, BULLET, advance_bullets, drop_eggs, acting_invaders, ship_hit, \
+	encode, shift_down
+
+
+# action codes of VectorSpace.step
+ACTIONS = ['a', 'd', 'w', 'remain']
+# code of each action of Model.Space; any other action (e.g. None) is NOTHING: the ship does nothing
+CODES = {'a': 0, 'left': 0, 'd': 1, 'right': 1, 'w': 2, 'shoot': 2, 'remain': 3}
+NOTHING = 4
+
+
+class VectorSpace(object):
+	"""
+	N games played in lockstep
+		planes: (np.array of bool, shape(n, 4, height, width)) planes of every game
+		ship_y, available: (np.array, shape(n,)) spaceship of every game
+		turn: (np.array, shape(n,)) Space.step of every game
+	Each game follows the rules of Model.Space; eggs are laid by the same
+	rule (1 to 3 random acting invaders every 3 steps) from the generator of
+	the VectorSpace. A game that ends is started again at once, so to
+	compare with Model.Space keep the first game of each slot: taking the
+	first games to end favours short games.
+	Games built by from_space lay their eggs from the streams of their Model.Space
+	instead, so they stay identical to it step for step (see engines.fuzz).
+	"""
+	def __init__(self, n: int, height: int, width: int, num: int, seed=None):
+		self.n = n
+		self.height = height
+		self.width = width
+		self.num = num
+		self.rng = np.random.default_rng(seed)
+		self.planes = np.zeros((n, 4, height, width), dtype=bool)
+		self.ship_y = np.zeros(n, dtype=int)
+		self.available = np.ones(n, dtype=bool)
+		self.turn = np.zeros(n, dtype=int)
+		# RandomStreams laying the eggs of each game (None: the generator of the VectorSpace)
+		self._streams = [None] * n
+		self.reset()
+
+	@classmethod
+	def from_space(cls, spaces):
+		"""
+		Build a VectorSpace playing on from the states of <spaces> (Model.Space of the same board
+		and number of invaders, each at a decision as in GameModel.run: step counted, bullets moved).
+		Game i lays its eggs from the streams of spaces[i] until it ends.
+		"""
+		first = spaces[0]
+		new = cls(len(spaces), first.height, first.width, first.num)
+		new.planes[...] = False
+		for i, space in enumerate(spaces):
+			for layer, objects in [(INVADER, space.invaders), (EGG, space.eggs), (BULLET, space.bullets)]:
+				for o in objects:
+					new.planes[i, layer, o.x, o.y] = True
+			x, y = space.spaceship.get_position()
+			new.planes[i, SHIP, x, y] = True
+			new.ship_y[i] = y
+			new.available[i] = space.spaceship.available
+			new.turn[i] = space.step
+			new._streams[i] = space
+		return new
+
+	@property
+	def figure(self):
+		"""
+		Additive figures of all games, shape(n, height, width)
+		"""
+		return encode(self.planes)
+
+	def reset(self, games=None):
+		"""
+		Start games again (default: all of them) with a new layout
+		and advance them to their first decision
+		return planes
+		"""
+		games = np.arange(self.n) if games is None else np.flatnonzero(games)
+		if not len(games):
+			return self.planes
+		planes = self.planes[games]
+		planes[...] = False
+		# <num> invaders among the 2 first rows, as Space.invaders_initialize
+		cal = np.argsort(self.rng.random((len(games), 2 * self.width)), axis=1)[:, :self.num]
+		rows = np.repeat(np.arange(len(games)), self.num)
+		planes[rows, INVADER, (cal % 2).ravel(), (cal // 2).ravel()] = True
+		planes[:, SHIP, self.height - 1, self.width // 2] = True
+		self.planes[games] = planes
+		self.ship_y[games] = self.width // 2
+		self.available[games] = True
+		self.turn[games] = 0
+		for game in games:
+			self._streams[game] = None
+		return self.planes
+
+	def _lay(self, games):
+		"""
+		Let 1 to 3 acting invaders lay an egg in each of <games> (bool mask)
+		"""
+		acting = acting_invaders(self.planes) & games[:, None, None]
+		flat = acting.reshape(self.n, -1)
+		count = flat.sum(axis=1)
+		laying = count > 0
+		if not laying.any():
+			return
+		for game in np.flatnonzero(laying):
+			streams = self._streams[game]
+			if streams is not None:
+				# the draw of Space.invader_actions: acting invaders column by column
+				cells = np.argwhere(acting[game].T)
+				y, x = cells[streams.draw_laying(len(cells), streams.egg_rng(int(self.turn[game])))].T
+				self.planes[game, EGG, x + 1, y] = True
+				laying[game] = False
+		if not laying.any():
+			return
+		number = np.zeros(self.n, dtype=int)
+		number[laying] = self.rng.integers(1, np.minimum(4, 1 + count[laying]))
+		# random rank of each acting invader, keep the <number> first ones
+		keys = np.where(flat, self.rng.random(flat.shape), np.inf)
+		ranks = np.empty_like(flat, dtype=int)
+		np.put_along_axis(ranks, np.argsort(keys, axis=1), np.arange(flat.shape[1])[None, :], axis=1)
+		chosen = (ranks < number[:, None]) & flat
+		self.planes[:, EGG] |= shift_down(chosen.reshape(acting.shape), 1)
+
+	def step(self, actions):
+		"""
+		Play one action in every game
+		actions: codes (index of ACTIONS, NOTHING) or actions of Model.Space ('a', 'left', 'shoot', None, ...),
+			one per game
+		return planes, done, win, steps
+			done, win: (np.array of bool) game ended / was won by this action
+			steps: number of steps played in each game (in the ended game where done)
+		Ended games are started again before returning.
+		"""
+		actions = np.asarray(actions)
+		if actions.dtype.kind not in 'iu':
+			actions = np.array([a if isinstance(a, (int, np.integer)) else CODES.get(a, NOTHING)
+					for a in actions.tolist()])
+		games = np.arange(self.n)
+		h, w = self.height, self.width
+
+		# spaceship
+		left = (actions == 0) & (self.ship_y >= 1)
+		right = (actions == 1) & (self.ship_y < w - 1)
+		shoot = actions == 2
+		fired = shoot & self.available
+		self.available = np.where(shoot, ~self.available, self.available | (actions != NOTHING))
+		self.planes[games[fired], BULLET, h - 2, self.ship_y[fired]] = True
+		self.planes[games, SHIP, h - 1, self.ship_y] = False
+		self.ship_y = self.ship_y - left + right
+		self.planes[games, SHIP, h - 1, self.ship_y] = True
+
+		drop_eggs(self.planes)
+		lose = ship_hit(self.planes)
+		self._lay((self.turn % 3 == 0) & ~lose)
+		win = ~lose & ~self.planes[:, INVADER].any(axis=(1, 2))
+		done = lose | win
+		steps = self.turn + 1
+
+		self.reset(done)
+		going = ~done
+		self.turn[going] += 1
+		planes = self.planes[going]
+		advance_bullets(planes)
+		self.planes[going] = planes
+		return self.planes, done, win, steps
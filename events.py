@@ -0,0 +1,100 @@
+#
+#
+# Event bus of the game: GameModel and Space publish what happens in a game,
+# recorders, loggers, viewers and metrics subscribe to it.
+#
+#
+
+
+# Events and their data (keyword arguments of the callbacks)
+EVENTS = {
+	'game_start': ('figure',),
+	'step_start': ('step',),
+	'action_chosen': ('step', 'action'),
+	'decision_timeout': ('step', 'timeout', 'action'),
+	'bullet_hit': ('x', 'y'),
+	'egg_laid': ('x', 'y'),
+	'egg_broken': ('x', 'y'),
+	'ship_hit': ('x', 'y'),
+	'step_end': ('step', 'figure'),
+	'game_over': ('result', 'steps', 'time', 'speed', 'ship'),
+}
+
+
+class EventBus(object):
+	"""
+	Callbacks registered by event name.
+	An event nobody subscribed to costs one dict lookup.
+	Data (e.g. figure) is passed as is: copy it to keep it after the callback.
+	Space does not publish while a search is trying moves (apply/undo records open).
+	"""
+	def __init__(self):
+		self._subscribers = {}
+
+	def subscribe(self, event: str, callback):
+		"""
+		Call <callback>(**data) on every <event>, return callback (usable as decorator)
+		"""
+		if event not in EVENTS:
+			raise ValueError(f'Unknown event {event!r}, choose one of {list(EVENTS)}.')
+		self._subscribers.setdefault(event, []).append(callback)
+		return callback
+
+	def unsubscribe(self, event: str, callback):
+		callbacks = self._subscribers.get(event, [])
+		if callback in callbacks:
+			callbacks.remove(callback)
+		if not callbacks:
+			self._subscribers.pop(event, None)
+
+	def __contains__(self, event: str):
+		"""
+		Whether <event> has subscribers
+		"""
+		return event in self._subscribers
+
+	def emit(self, event: str, **data):
+		callbacks = self._subscribers.get(event)
+		if callbacks:
+			for callback in callbacks:
+				callback(**data)
+
+
+class ConsoleLogger(object):
+	"""
+	Print a game on the console (the output of GameModel.run)
+	"""
+	def attach(self, bus: EventBus):
+		for event in ['game_start', 'step_start', 'decision_timeout', 'action_chosen', 'step_end', 'game_over']:
+			bus.subscribe(event, getattr(self, event))
+
+	def detach(self, bus: EventBus):
+		for event in ['game_start', 'step_start', 'decision_timeout', 'action_chosen', 'step_end', 'game_over']:
+			bus.unsubscribe(event, getattr(self, event))
+
+	def game_start(self, figure):
+		print(figure)
+		print('-+-+'*20)
+
+	def step_start(self, step):
+		print('Start algorithm.')
+
+	def decision_timeout(self, step, timeout, action):
+		print(f'No decision within {timeout} seconds, fallback: {action}')
+
+	def action_chosen(self, step, action):
+		print(f'Step {step + 1}: Do You choose: {action}')
+
+	def step_end(self, step, figure):
+		print(figure)
+		print('---'*10)
+
+	def game_over(self, result, steps, time, speed, ship):
+		if result:
+			print('WINNING')
+		else:
+			print('LOSING')
+			print(f'Collision occurs at x = {ship[0]} , y = {ship[1]}')
+		print(f'Running time: {time}')
+		print(f'Number of steps: {steps}')
+		print(f'Steps per second: {speed:.1f}')
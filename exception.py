@@ -17,3 +17,7 @@ class GameNotRun(Exception):
 
 class GameAlreadyRun(Exception):
 	pass
+
+
+class DecisionTimeout(Exception):
+	pass
@@ -54,6 +54,7 @@ def main():
     # Evaluate multiple time
     # eva = game.getEvaluate()
     # eva.evamultitime(local_search, times= 50)
+    # eva.evamultitime(local_search, times= 50, headless=True, record=False)  # no console output
     # eva.evamultitime(expectimax_getaction, times= 5, maxdepth=3, maxrandom=3)
     # eva.evamultitime(a_star_search, 25)
     # eva.saveGame('Testmulti')
@@ -0,0 +1,87 @@
+#
+#
+# Per-phase timing of GameModel.run: how long each phase of every step takes,
+# per game and over all the games of a run, exported as JSON.
+#
+#
+import json
+import timeit
+import numpy as np
+
+
+class Profiler(object):
+	"""
+	High-resolution timers around the phases of the game loop
+		games: (list) one dict per game: phase -> list of durations (seconds)
+	Usage:
+		profiler = Profiler()
+		game.run(local_search, headless=True, profiler=profiler)
+		profiler.to_json('profile.json')
+	"""
+	PHASES = ['update_bullet', 'algorithm', 'move', 'update_egg', 'check_losing', 'invader_actions',
+			'check_winning', 'record']
+
+	def __init__(self):
+		self.games = []
+		self._game = None
+		self._last = 0
+
+	def start_game(self):
+		self._game = {phase: [] for phase in self.PHASES}
+		self.games.append(self._game)
+		self._last = timeit.default_timer()
+
+	def lap(self, phase: str = None):
+		"""
+		Count the time since the last lap in <phase> (None: not counted, e.g. event callbacks)
+		"""
+		now = timeit.default_timer()
+		if phase is not None:
+			self._game[phase].append(now - self._last)
+		self._last = now
+
+	@staticmethod
+	def stats(durations):
+		"""
+		Count, total, mean, p50/p95/p99 and histogram (power of 2 buckets) of <durations>, in microseconds
+		"""
+		us = np.asarray(durations, dtype=float) * 1e6
+		if not len(us):
+			return {'count': 0}
+		edges = 2.0 ** np.arange(int(np.ceil(np.log2(max(us.max(), 1)))) + 2)
+		counts, _ = np.histogram(us, bins=np.concatenate([[0], edges]))
+		p50, p95, p99 = np.percentile(us, [50, 95, 99])
+		return {
+			'count': len(us),
+			'total': float(us.sum()),
+			'mean': float(us.mean()),
+			'p50': float(p50),
+			'p95': float(p95),
+			'p99': float(p99),
+			'max': float(us.max()),
+			'histogram': {'upper_us': edges.tolist(), 'counts': counts.tolist()},
+		}
+
+	def summary(self, game: int = None):
+		"""
+		dict phase -> stats of game number <game>, or of all the games if None
+		"""
+		games = self.games if game is None else [self.games[game]]
+		return {phase: self.stats([d for g in games for d in g[phase]]) for phase in self.PHASES}
+
+	def report(self):
+		return {
+			'unit': 'us',
+			'run': self.summary(),
+			'games': [self.summary(i) for i in range(len(self.games))],
+		}
+
+	def to_json(self, filename: str = None):
+		"""
+		return the report as JSON, also written to <filename> if given
+		"""
+		text = json.dumps(self.report(), indent=2)
+		if filename is not None:
+			with open(filename, 'w') as f:
+				f.write(text)
+		return text
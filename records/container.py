@@ -0,0 +1,163 @@
+#
+#
+# Multi-game container: the figures of many games in one file with an index of
+# per-game offsets, lengths and summaries, so that one game is read through a
+# memory map without loading the others.
+#
+# File data/<name>.games:
+#   header (32 bytes): magic, index offset, number of games, metadata length
+#   figures: int8 (steps, height, width) of every game, one after the other
+#   index: one INDEX record per game
+#   metadata: JSON height, width, algorithm names
+#
+# Usage: python -m records.container NAME   (convert data/NAME_multi.pickle of saveGame)
+#
+#
+import argparse
+import collections
+import json
+import os
+import pickle
+import struct
+import numpy as np
+
+
+MAGIC = b'CIGAMES1'
+HEADER = struct.Struct('<8sQQQ')
+# offset and length in steps, result 1 win / 0 lose / -1 unknown, algorithm: number in the metadata
+INDEX = np.dtype([('offset', '<i8'), ('length', '<i4'), ('result', 'i1'), ('steps', '<i4'), ('seed', '<i8'),
+		('time', '<f8'), ('algorithm', '<i2')])
+
+
+def _path(filename: str):
+	return os.path.join('data', f'{filename}.games')
+
+
+class ArchiveWriter(object):
+	"""
+	Write games one by one to data/<filename>.games: figures go to disk at once,
+	only the index stays in memory until close.
+	Same interface as records.stream.GameStream, so it can be the sink of Evaluate.evamultitime:
+		with ArchiveWriter('Eval1', 9, 7, algorithm='local_search') as archive:
+			eva.evamultitime(local_search, times=10000, headless=True, sink=archive)
+	"""
+	def __init__(self, filename: str, height: int, width: int, algorithm: str = None, keep: int = 0):
+		os.makedirs('data', exist_ok=True)
+		self.path = _path(filename)
+		self.height = height
+		self.width = width
+		self.algorithm = algorithm
+		self.recent = collections.deque(maxlen=keep)
+		self.count = 0
+		self._algorithms = []
+		self._index = []
+		self._steps = 0
+		self._file = open(self.path, 'wb')
+		self._file.write(HEADER.pack(MAGIC, 0, 0, 0))
+
+	def write(self, states, result=None, steps=None, time=None, seed=None, algorithm: str = None):
+		"""
+		Append one game (algorithm: default the one of the writer)
+		"""
+		figures = np.asarray(states if states is not None else [], dtype=np.int8).reshape(-1, self.height, self.width)
+		self._file.write(figures.tobytes())
+		algorithm = algorithm or self.algorithm
+		if algorithm not in self._algorithms:
+			self._algorithms.append(algorithm)
+		self._index.append((self._steps, len(figures), -1 if result is None else int(result),
+				-1 if steps is None else steps, -1 if seed is None else seed, np.nan if time is None else time,
+				self._algorithms.index(algorithm)))
+		self._steps += len(figures)
+		self.recent.append(states)
+		self.count += 1
+
+	def close(self):
+		"""
+		Write the index and the metadata, then the header pointing to them
+		"""
+		index_offset = self._file.tell()
+		self._file.write(np.array(self._index, dtype=INDEX).tobytes())
+		meta = json.dumps({'height': self.height, 'width': self.width, 'algorithms': self._algorithms}).encode()
+		self._file.write(meta)
+		self._file.seek(0)
+		self._file.write(HEADER.pack(MAGIC, index_offset, len(self._index), len(meta)))
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+class Archive(object):
+	"""
+	Games of data/<filename>.games, memory-mapped: opening reads the header, index and metadata only,
+	archive[i] is a read-only view of the figures of game i (no copy, read from disk on demand).
+		index: (np.array of INDEX) offset, length, result, steps, seed, time, algorithm of every game
+		algorithms: (list) names of the algorithms (index['algorithm'] gives their number)
+	"""
+	def __init__(self, filename: str):
+		with open(_path(filename), 'rb') as f:
+			magic, index_offset, count, meta_length = HEADER.unpack(f.read(HEADER.size))
+			if magic != MAGIC:
+				raise ValueError(f'{_path(filename)} is not a games file.')
+			f.seek(index_offset + count * INDEX.itemsize)
+			meta = json.loads(f.read(meta_length))
+		self.height, self.width, self.algorithms = meta['height'], meta['width'], meta['algorithms']
+		self.index = np.memmap(_path(filename), dtype=INDEX, mode='r', offset=index_offset, shape=(count,))
+		steps = (index_offset - HEADER.size) // (self.height * self.width) if count else 0
+		self._figures = np.memmap(_path(filename), dtype=np.int8, mode='r', offset=HEADER.size,
+				shape=(steps, self.height, self.width)) if steps else np.zeros((0, self.height, self.width), np.int8)
+
+	def __len__(self):
+		return len(self.index)
+
+	def __getitem__(self, game: int):
+		entry = self.index[game]
+		return self._figures[entry['offset']:entry['offset'] + entry['length']]
+
+	def __iter__(self):
+		for game in range(len(self)):
+			yield self[game]
+
+	def summary(self, game: int):
+		"""
+		dict result, steps, algorithm, seed, time of <game>
+		"""
+		entry = self.index[game]
+		return {
+			'result': None if entry['result'] < 0 else bool(entry['result']),
+			'steps': int(entry['steps']),
+			'algorithm': self.algorithms[entry['algorithm']],
+			'seed': int(entry['seed']),
+			'time': float(entry['time']),
+		}
+
+
+def convert(filename: str, algorithm: str = None):
+	"""
+	Convert data/<filename>_multi.pickle (saveGame) to data/<filename>.games, return the path
+	(saveGame keeps figures only: results and steps are unknown, the steps are the figures - 2)
+	"""
+	with open(os.path.join('data', f'{filename}_multi.pickle'), 'rb') as f:
+		games = [np.asarray(states) for states in pickle.load(f) if states is not None and len(states)]
+	height, width = games[0].shape[1:] if games else (0, 0)
+	with ArchiveWriter(filename, height, width, algorithm) as archive:
+		for states in games:
+			archive.write(states, steps=len(states) - 2)
+	return archive.path
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Convert saveGame pickles to indexed games files.')
+	parser.add_argument('names', nargs='+')
+	parser.add_argument('--algorithm', default=None)
+	args = parser.parse_args()
+	for name in args.names:
+		path = convert(name, args.algorithm)
+		print(f'{path}: {len(Archive(name))} games')
+
+
+if __name__ == '__main__':
+	main()
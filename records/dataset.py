@@ -0,0 +1,210 @@
+#
+#
+# Self-play datasets: an algorithm plays many seeded games in worker processes and
+# every decision becomes a record (state, action, outcome, step), written to
+# fixed-size compressed .npz shards listed in a manifest. Writing resumes where it
+# stopped after a crash; the loader streams the shards back in batches.
+#
+# Folder data/<name>/:
+#   manifest.json: settings, shards written, next game to play
+#   shard-00000.npz, ...: arrays state (n, height, width) int8, action int8
+#       (index in ACTIONS), outcome int8 (1 win / 0 lose), step int32, seed int64
+#
+#
+import concurrent.futures
+import json
+import os
+import numpy as np
+from Model import GameModel
+from watchdog import Watchdog
+from records.replay import CODES
+
+
+# action codes of the records ('-': anything else, which moves nothing)
+ACTIONS = 'adwr-'
+FIELDS = ['state', 'action', 'outcome', 'step', 'seed']
+
+
+def _play(task):
+	"""
+	Play one game in a worker process
+	return the records of its decisions (dict field -> array)
+	"""
+	algorithm, height, width, num, seed, maxdepth, maxrandom, timeout, fallback = task
+	args = (maxdepth, maxrandom) if 'expectimax' in algorithm.__name__ else ()
+	game = GameModel()
+	game.initialize(height, width, num, seed)
+	observation = game.reset()
+	states, actions = [], []
+	done = False
+	# a decision over <timeout> seconds plays <fallback>, as in GameModel.run
+	watchdog = Watchdog(timeout, fallback) if timeout is not None else None
+	try:
+		while not done:
+			if watchdog is None:
+				action = algorithm(game.getSpace(), *args)
+			else:
+				action = watchdog.decide(algorithm, game.getSpace(), *args)
+			# the state the algorithm decided on
+			states.append(np.array(observation, dtype=np.int8))
+			actions.append(ACTIONS.index(CODES.get(action, '-')))
+			observation, _, done, info = game.step(action)
+	finally:
+		if watchdog is not None:
+			watchdog.stop()
+	n = len(actions)
+	return {
+		'state': np.array(states, dtype=np.int8).reshape(n, height, width),
+		'action': np.array(actions, dtype=np.int8),
+		'outcome': np.full(n, int(info['result']), dtype=np.int8),
+		'step': np.arange(n, dtype=np.int32),
+		'seed': np.full(n, seed, dtype=np.int64),
+	}
+
+
+class ShardWriter(object):
+	"""
+	Records buffered in preallocated arrays of <shard_size> records, written as one shard
+	when full: memory is bounded by one shard whatever the number of games.
+	The manifest is replaced (atomically) after every shard, so a crash loses at most
+	the records of the current shard, which resume plays again.
+	"""
+	def __init__(self, folder: str, manifest: dict):
+		self.folder = folder
+		self.manifest = manifest
+		height, width = manifest['height'], manifest['width']
+		size = manifest['shard_size']
+		self._buffer = {
+			'state': np.zeros((size, height, width), dtype=np.int8),
+			'action': np.zeros(size, dtype=np.int8),
+			'outcome': np.zeros(size, dtype=np.int8),
+			'step': np.zeros(size, dtype=np.int32),
+			'seed': np.zeros(size, dtype=np.int64),
+		}
+		self._len = 0
+		# game of the first record in the buffer, and its records already in the shards
+		self._game, self._skip = manifest['next_game'], manifest['skip']
+
+	def write(self, game: int, records: dict):
+		"""
+		Add the records of game number <game> (games are written in order)
+		"""
+		n = len(records['action'])
+		start = self._skip if game == self._game else 0
+		while start < n:
+			count = min(n - start, len(self._buffer['action']) - self._len)
+			for field in FIELDS:
+				self._buffer[field][self._len:self._len + count] = records[field][start:start + count]
+			self._len += count
+			start += count
+			if self._len == len(self._buffer['action']):
+				# resume from here: game <game> without its first <start> records, or the next game
+				if start < n:
+					self.flush(game, start)
+				else:
+					self.flush(game + 1)
+
+	def flush(self, next_game: int, skip: int = 0):
+		"""
+		Write the buffer as a shard, then the manifest
+		"""
+		if self._len:
+			name = f'shard-{len(self.manifest["shards"]):05d}.npz'
+			np.savez_compressed(os.path.join(self.folder, name),
+					**{field: self._buffer[field][:self._len] for field in FIELDS})
+			self.manifest['shards'].append({'file': name, 'records': self._len})
+			self.manifest['records'] += self._len
+			self._len = 0
+		self.manifest['next_game'], self.manifest['skip'] = next_game, skip
+		self._game, self._skip = next_game, skip
+		_write_manifest(self.folder, self.manifest)
+
+
+def _write_manifest(folder: str, manifest: dict):
+	path = os.path.join(folder, 'manifest.json')
+	with open(path + '.tmp', 'w') as f:
+		json.dump(manifest, f, indent=1)
+	os.replace(path + '.tmp', path)
+
+
+def generate(name: str, algorithm, seeds, height=9, width=7, num=14, maxdepth=None, maxrandom=None, workers=1,
+		shard_size=4096, timeout=None, fallback='remain'):
+	"""
+	Play one game of <algorithm> (local_search, greedy_bfs, expectimax_getaction, ...) per seed and
+	write its decisions to data/<name>/. An unfinished dataset of the same settings is resumed.
+	workers: number of processes playing the games (at most a few games per worker wait in memory)
+	timeout, fallback: deadline of each decision, see GameModel.run (the fallback is recorded as the action)
+	return the manifest
+	"""
+	folder = os.path.join('data', name)
+	os.makedirs(folder, exist_ok=True)
+	settings = {
+		'algorithm': algorithm.__name__, 'height': height, 'width': width, 'num': num,
+		'maxdepth': maxdepth, 'maxrandom': maxrandom, 'seeds': [int(seed) for seed in seeds],
+		'shard_size': shard_size, 'timeout': timeout, 'fallback': fallback,
+	}
+	manifest = load_manifest(name)
+	if manifest is None:
+		manifest = dict(settings, shards=[], records=0, next_game=0, skip=0, complete=False)
+	elif any(manifest[key] != value for key, value in settings.items()):
+		raise ValueError(f'{folder} holds a dataset of other settings.')
+	if manifest['complete']:
+		return manifest
+
+	seeds = manifest['seeds']
+	writer = ShardWriter(folder, manifest)
+	tasks = ((algorithm, height, width, num, seeds[i], maxdepth, maxrandom, timeout, fallback)
+			for i in range(manifest['next_game'], len(seeds)))
+	games = range(manifest['next_game'], len(seeds))
+	if workers > 1:
+		with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+			window = []
+			for game, task in zip(games, tasks):
+				window.append((game, executor.submit(_play, task)))
+				# a few games ahead per worker, written in order
+				if len(window) >= 2 * workers:
+					done, future = window.pop(0)
+					writer.write(done, future.result())
+			for done, future in window:
+				writer.write(done, future.result())
+	else:
+		for game, task in zip(games, tasks):
+			writer.write(game, _play(task))
+	writer.flush(len(seeds))
+	manifest['complete'] = True
+	_write_manifest(folder, manifest)
+	return manifest
+
+
+def load_manifest(name: str):
+	"""
+	Manifest of data/<name>/ (None if there is none)
+	"""
+	path = os.path.join('data', name, 'manifest.json')
+	if not os.path.exists(path):
+		return None
+	with open(path) as f:
+		return json.load(f)
+
+
+def load(name: str, batch_size: int = 256, fields=FIELDS):
+	"""
+	Yield the records of data/<name>/ in batches: dict field -> array of <batch_size> records
+	(the last batch may be smaller). One shard is in memory at a time.
+	"""
+	manifest = load_manifest(name)
+	if manifest is None:
+		raise FileNotFoundError(f'No dataset in data/{name}.')
+	rest = None
+	for shard in manifest['shards']:
+		with np.load(os.path.join('data', name, shard['file'])) as f:
+			arrays = {field: f[field] for field in fields}
+		if rest is not None:
+			arrays = {field: np.concatenate([rest[field], arrays[field]]) for field in fields}
+		n = len(arrays[fields[0]])
+		end = n - n % batch_size
+		for start in range(0, end, batch_size):
+			yield {field: arrays[field][start:start + batch_size] for field in fields}
+		rest = {field: arrays[field][end:] for field in fields} if end < n else None
+	if rest is not None:
+		yield rest
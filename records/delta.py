@@ -0,0 +1,137 @@
+#
+#
+# Delta-encoded trajectories: a keyframe every K steps of a game and, in between, only
+# the cells that changed (cell, old value, new value). Any step is rebuilt from its
+# keyframe with at most K - 1 deltas, forward or backward from the last step read.
+#
+# Usage: python -m records.delta NAME [NAME ...] [--keyframe K]
+#   convert data/NAME.pickle (saveData) or data/NAME_multi.pickle (saveGame)
+#
+#
+import argparse
+import os
+import pickle
+import numpy as np
+
+
+def encode(games, keyframe: int = 16):
+	"""
+	Arrays of the delta format of <games> (list of figures of each game)
+		games: game g is made of the steps games[g]:games[g + 1] of the file
+		keys, keyframes: steps holding a whole figure (the first step of every game, then every K steps)
+		cells, old, new: changes of the other steps, flat cell index and values
+		offsets: changes of step t are cells[offsets[t]:offsets[t + 1]] (none for keyframes)
+	"""
+	games = [np.asarray(states, dtype=np.int8) for states in games]
+	states = np.concatenate(games)
+	steps, height, width = states.shape
+	bounds = np.cumsum([0] + [len(states) for states in games])
+	keys = np.concatenate([np.arange(bounds[g], bounds[g + 1], keyframe) for g in range(len(games))])
+	flat = states.reshape(steps, -1)
+	changed = np.zeros_like(flat, dtype=bool)
+	changed[1:] = flat[1:] != flat[:-1]
+	changed[keys] = False
+	step, cells = np.nonzero(changed)
+	offsets = np.zeros(steps + 1, dtype=np.int64)
+	np.cumsum(np.bincount(step, minlength=steps), out=offsets[1:])
+	return {
+		'shape': np.array([steps, height, width]),
+		'games': bounds,
+		'keys': keys,
+		'keyframes': states[keys],
+		'cells': cells.astype(np.int32),
+		'old': flat[step - 1, cells],
+		'new': flat[step, cells],
+		'offsets': offsets,
+	}
+
+
+def save(filename: str, games, keyframe: int = 16):
+	"""
+	Save <games> (list of figures of each game) in data/<filename>.delta.npz, return the path
+	"""
+	os.makedirs('data', exist_ok=True)
+	path = os.path.join('data', f'{filename}.delta.npz')
+	np.savez_compressed(path, **encode(games, keyframe))
+	return path
+
+
+class DeltaReader(object):
+	"""
+	Figures of game <game> of data/<filename>.delta.npz, list-like (len, index):
+	each figure is rebuilt on demand, reading steps in order (scrubbing) applies one delta per step.
+	The figure returned is read-only and changes with the next read: copy it to keep it.
+		games: number of games of the file
+	"""
+	def __init__(self, filename: str, game: int = 0):
+		with np.load(os.path.join('data', f'{filename}.delta.npz')) as f:
+			arrays = {name: f[name] for name in f.files}
+		_, height, width = arrays['shape']
+		self.games = len(arrays['games']) - 1
+		self._first, self._end = arrays['games'][game], arrays['games'][game + 1]
+		self._keys, self._keyframes = arrays['keys'], arrays['keyframes']
+		self._cells, self._old, self._new = arrays['cells'], arrays['old'], arrays['new']
+		self._offsets = arrays['offsets']
+		self._frame = np.zeros(height * width, dtype=np.int8)
+		self._key = None
+		self._step = None
+
+	def __len__(self):
+		return int(self._end - self._first)
+
+	def _apply(self, step: int, values):
+		start, end = self._offsets[step], self._offsets[step + 1]
+		self._frame[self._cells[start:end]] = values[start:end]
+
+	def __getitem__(self, step: int):
+		if step < 0:
+			step += len(self)
+		if not 0 <= step < len(self):
+			raise IndexError(f'step {step} out of range')
+		step += self._first
+		key = np.searchsorted(self._keys, step, side='right') - 1
+		if key != self._key:
+			self._frame[:] = self._keyframes[key].ravel()
+			self._key, self._step = key, self._keys[key]
+		while self._step < step:
+			self._step += 1
+			self._apply(self._step, self._new)
+		while self._step > step:
+			self._apply(self._step, self._old)
+			self._step -= 1
+		frame = self._frame.reshape(self._keyframes.shape[1:]).view()
+		frame.flags.writeable = False
+		return frame
+
+	def __iter__(self):
+		for step in range(len(self)):
+			yield self[step]
+
+
+def convert(filename: str, keyframe: int = 16):
+	"""
+	Convert data/<filename>.pickle (saveData) or data/<filename>_multi.pickle (saveGame) to
+	data/<filename>.delta.npz, return the path
+	"""
+	single = os.path.join('data', f'{filename}.pickle')
+	if os.path.exists(single):
+		with open(single, 'rb') as f:
+			return save(filename, [pickle.load(f)], keyframe)
+	with open(os.path.join('data', f'{filename}_multi.pickle'), 'rb') as f:
+		games = pickle.load(f)
+	# games run without record have no states
+	return save(filename, [states for states in games if states is not None and len(states)], keyframe)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Convert recorded games to the delta format.')
+	parser.add_argument('names', nargs='+')
+	parser.add_argument('--keyframe', type=int, default=16)
+	args = parser.parse_args()
+	for name in args.names:
+		path = convert(name, args.keyframe)
+		print(f'{path}: {os.path.getsize(path)} bytes')
+
+
+if __name__ == '__main__':
+	main()
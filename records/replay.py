@@ -0,0 +1,161 @@
+#
+#
+# Replays: a game is fully determined by its board, number of invaders, seed and
+# actions, so a few hundred bytes of JSON are enough to rebuild any of its states.
+#
+# Usage: python -m records.replay NAME [NAME ...]   (verify data/NAME.replay.json)
+#
+#
+import argparse
+import json
+import os
+import numpy as np
+from Model import Space
+
+
+# one letter per action ('-': anything else, which moves nothing)
+CODES = {'a': 'a', 'left': 'a', 'd': 'd', 'right': 'd', 'w': 'w', 'shoot': 'w', 'remain': 'r'}
+ACTIONS = {'a': 'a', 'd': 'd', 'w': 'w', 'r': 'remain', '-': None}
+
+
+class Replay(object):
+	"""
+	Game rebuilt from (height, width, num, seed, actions), list-like: replay[t] is the figure
+	after t steps, as recorded by GameModel.run (replay[0]: start, replay[-1]: end of the game).
+	States are played on demand with Model.Space; a copy of the space is kept every <checkpoint>
+	steps, so going back replays at most that many steps.
+		result, final: result and last figure of the recorded game (None: unknown), see verify
+	"""
+	def __init__(self, height: int, width: int, num: int, seed: int, actions, result=None, final=None,
+			checkpoint: int = 32):
+		self.height = height
+		self.width = width
+		self.num = num
+		self.seed = seed
+		self.actions = list(actions)
+		self.result = result
+		self.final = final
+		self.checkpoint = checkpoint
+		self._checkpoints = {}
+		self._space = None
+		self._at = None
+		self._over = None
+
+	@classmethod
+	def from_game(cls, game: 'GameModel'):
+		"""
+		Replay of the last game of <game> (run, or reset / step)
+		"""
+		space = game.getSpace()
+		result = True if space.check_winning() else False if space.check_losing() else None
+		return cls(space.height, space.width, space.num, space.rng_seed, game.getActionsStatistic(), result,
+				np.array(space.figure))
+
+	def __len__(self):
+		return len(self.actions) + 1
+
+	def _start(self):
+		space = Space(self.height, self.width)
+		space.seed(self.seed)
+		space.initialize(self.num)
+		self._space, self._at, self._over = space, 0, None
+
+	def _play(self):
+		"""
+		Play step self._at + 1 (the loop of GameModel._play)
+		"""
+		if self._over is not None:
+			raise ValueError(f'The game is over after {self._at} steps, {len(self.actions)} actions recorded.')
+		space = self._space
+		space.step += 1
+		space.update_bullet()
+		space.spaceship.move(self.actions[self._at])
+		space.update_egg()
+		self._at += 1
+		if space.check_losing():
+			self._over = False
+			return
+		space.invader_actions()
+		if space.check_winning():
+			self._over = True
+
+	def __getitem__(self, step: int):
+		if step < 0:
+			step += len(self)
+		if not 0 <= step < len(self):
+			raise IndexError(f'step {step} out of range')
+		if self._space is None or self._at > step:
+			start = step - step % self.checkpoint
+			if start in self._checkpoints:
+				space, self._over = self._checkpoints[start]
+				self._space, self._at = space.clone(), start
+			else:
+				self._start()
+		while self._at < step:
+			self._play()
+			if self._at % self.checkpoint == 0 and self._at not in self._checkpoints:
+				self._checkpoints[self._at] = (self._space.clone(), self._over)
+		figure = np.asarray(self._space.figure).view()
+		figure.flags.writeable = False
+		return figure
+
+	def __iter__(self):
+		for step in range(len(self)):
+			yield self[step]
+
+	def verify(self):
+		"""
+		Whether replaying all the actions ends the game (exactly at the last one)
+		with the recorded result and final figure
+		"""
+		try:
+			figure = self[-1]
+		except ValueError:
+			# game over before the last action
+			return False
+		if self.result is not None and self._over != self.result:
+			return False
+		return self.final is None or np.array_equal(figure, self.final)
+
+	def save(self, filename: str):
+		"""
+		Save the replay in data/<filename>.replay.json, return the path
+		"""
+		os.makedirs('data', exist_ok=True)
+		path = os.path.join('data', f'{filename}.replay.json')
+		record = {
+			'height': self.height,
+			'width': self.width,
+			'num': self.num,
+			'seed': int(self.seed),
+			'actions': ''.join(CODES.get(action, '-') for action in self.actions),
+			'result': self.result,
+			# figure values are at most 15: one hexadecimal digit per cell
+			'final': None if self.final is None else ''.join(f'{v:x}' for v in np.ravel(self.final)),
+		}
+		with open(path, 'w') as f:
+			json.dump(record, f, separators=(',', ':'))
+		return path
+
+	@classmethod
+	def load(cls, filename: str):
+		with open(os.path.join('data', f'{filename}.replay.json')) as f:
+			record = json.load(f)
+		final = record['final']
+		if final is not None:
+			final = np.array([int(v, 16) for v in final]).reshape(record['height'], record['width'])
+		return cls(record['height'], record['width'], record['num'], record['seed'],
+				[ACTIONS[code] for code in record['actions']], record['result'], final)
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Check that replays rebuild their recorded games.')
+	parser.add_argument('names', nargs='+')
+	args = parser.parse_args()
+	for name in args.names:
+		replay = Replay.load(name)
+		print(f'{name}: {len(replay.actions)} actions, {"ok" if replay.verify() else "MISMATCH"}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,63 @@
+#
+#
+# Streaming writer of evaluations: every finished game is appended to disk at
+# once and only the last few stay in memory, so long evaluations run in flat memory.
+#
+#
+import os
+import pickle
+import collections
+import numpy as np
+
+
+class GameStream(object):
+	"""
+	Games appended to data/<filename>_stream.pickle, one pickle per game:
+		dict states (np.array of the figures), result, steps, time, seed
+	keep: number of the last games whose states also stay in memory (recent: their states, as
+		Evaluate.evamultitime returns them)
+	append: go on with an existing file instead of starting a new one
+	Usage:
+		with GameStream('Eval1', keep=10) as stream:
+			eva.evamultitime(local_search, times=10000, headless=True, sink=stream)
+		for game in read_games('Eval1'):
+			...
+	"""
+	def __init__(self, filename: str, keep: int = 0, append: bool = False):
+		os.makedirs('data', exist_ok=True)
+		self.path = os.path.join('data', f'{filename}_stream.pickle')
+		self.recent = collections.deque(maxlen=keep)
+		self.count = 0
+		self._file = open(self.path, 'ab' if append else 'wb')
+
+	def write(self, states, result=None, steps=None, time=None, seed=None):
+		"""
+		Append one game, flushed so that a crash keeps the games already written
+		"""
+		# plain array: the file does not need records.trajectory to be read
+		game = {'states': None if states is None else np.asarray(states), 'result': result, 'steps': steps, 'time': time, 'seed': seed}
+		pickle.dump(game, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+		self._file.flush()
+		self.recent.append(states)
+		self.count += 1
+
+	def close(self):
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def read_games(filename: str):
+	"""
+	Yield the games of data/<filename>_stream.pickle one by one (one game in memory at a time)
+	"""
+	with open(os.path.join('data', f'{filename}_stream.pickle'), 'rb') as f:
+		while True:
+			try:
+				yield pickle.load(f)
+			except EOFError:
+				return
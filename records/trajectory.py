@@ -0,0 +1,66 @@
+#
+#
+# Trajectory of a game: the figure of every step in one growable (T, H, W) int8
+# array, saved as .npy and opened memory-mapped by the viewer.
+#
+#
+import os
+import numpy as np
+
+
+class Trajectory(object):
+	"""
+	Figures of a game, appended step by step (list-like: len, index, iteration)
+		array: (np.array of int8, shape(T, height, width)) the figures so far (a view, not a copy)
+	Figure values are at most 15 (invader + ship + egg + bullet), so int8 holds them.
+	The buffer doubles when full: appending copies the figure in place, nothing is allocated per step.
+	"""
+	def __init__(self, height: int, width: int, capacity: int = 64):
+		self._data = np.zeros((capacity, height, width), dtype=np.int8)
+		self._len = 0
+
+	def append(self, figure):
+		if self._len == len(self._data):
+			# at least 1: an empty trajectory (capacity 0, or unpickled) has to grow too
+			data = np.zeros((max(1, 2 * len(self._data)),) + self._data.shape[1:], dtype=np.int8)
+			data[:self._len] = self._data
+			self._data = data
+		self._data[self._len] = figure
+		self._len += 1
+
+	@property
+	def array(self):
+		return self._data[:self._len]
+
+	def __len__(self):
+		return self._len
+
+	def __getitem__(self, step):
+		return self.array[step]
+
+	def __iter__(self):
+		return iter(self.array)
+
+	def __array__(self, dtype=None, copy=None):
+		# np.asarray(trajectory): the figures so far
+		return self.array if dtype is None else self.array.astype(dtype)
+
+	def __getstate__(self):
+		# the unused end of the buffer is not pickled
+		return {'_data': self.array.copy(), '_len': self._len}
+
+	def save(self, filename: str):
+		"""
+		Save the figures in data/<filename>.npy, return the path
+		"""
+		os.makedirs('data', exist_ok=True)
+		path = os.path.join('data', f'{filename}.npy')
+		np.save(path, self.array)
+		return path
+
+
+def load(filename: str, mmap: bool = True):
+	"""
+	Figures of data/<filename>.npy, memory-mapped read-only (mmap=True: opened at once, read on demand)
+	"""
+	return np.load(os.path.join('data', f'{filename}.npy'), mmap_mode='r' if mmap else None)
@@ -0,0 +1,15 @@
+#
+#
+# Fixtures of the tests
+#
+#
+import pytest
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+	"""
+	Run the test in an empty directory: files go to its data/ folder
+	"""
+	monkeypatch.chdir(tmp_path)
+	return tmp_path
@@ -0,0 +1,43 @@
+#
+#
+# Helpers of the tests: random games played phase by phase, as GameModel.run does
+#
+#
+import random
+from Model import Space
+
+
+ACTIONS = ['a', 'd', 'w', 'remain']
+
+
+def play_step(space, action):
+	"""
+	One step of GameModel.run, return True if the game is over
+	"""
+	space.step += 1
+	space.update_bullet()
+	space.spaceship.move(action)
+	space.update_egg()
+	if space.check_losing():
+		return True
+	space.invader_actions()
+	return space.check_winning()
+
+
+def games(engine=None, count=20, steps=60, seed=0, height=9, width=7, num=14):
+	"""
+	Yield (space, rnd) at every step of <count> random games
+		engine: class built from the Space of each game (from_space), None: Space itself
+		rnd: random.Random of the game, to draw the next actions from
+	"""
+	for game in range(count):
+		rnd = random.Random(seed + game)
+		space = Space(height, width)
+		space.seed(seed + game)
+		space.initialize(num)
+		if engine is not None:
+			space = engine.from_space(space)
+		for _ in range(steps):
+			yield space, rnd
+			if play_step(space, rnd.choice(ACTIONS)):
+				break
@@ -0,0 +1,62 @@
+#
+#
+# engines.arrays.ArraySpace: same games as Model.Space, SpaceObject views over the pools
+#
+#
+from Model import GameModel, Space
+from algorithms.HD import local_search
+from engines import fuzz
+from engines.arrays import ArraySpace
+from helpers import ACTIONS, games, play_step
+
+
+def test_array_space_matches_space():
+	assert fuzz.fuzz(ArraySpace, games=40) > 0
+
+
+def test_views_follow_the_pools():
+	for space, rnd in games(ArraySpace, count=10):
+		for name in ['invaders', 'eggs', 'bullets']:
+			views = getattr(space, name)
+			pool = getattr(space, '_' + name)
+			live = pool.live()
+			assert [v.get_position() for v in views] == list(zip(pool.x[live].tolist(), pool.y[live].tolist()))
+		assert space.spaceship.get_position() == (space.ship_x, space.ship_y)
+
+
+def test_views_are_kept_until_objects_come_or_go():
+	for space, rnd in games(ArraySpace, count=10):
+		views = space.eggs
+		assert space.eggs is views
+		records = [space.apply(rnd.choice(ACTIONS)), space.apply_invaders()]
+		for record in reversed(records):
+			xs, ys = space.positions('Egg')
+			assert [v.get_position() for v in space.eggs] == list(zip(xs.tolist(), ys.tolist()))
+			space.undo(record)
+		assert space.eggs == views
+
+
+def test_views_move_their_object():
+	space = Space(9, 7)
+	space.seed(0)
+	space.initialize(14)
+	for action in ['w', 'remain', 'w', 'remain']:
+		play_step(space, action)
+	other = ArraySpace.from_space(space)
+	for s in [space, other]:
+		s.step += 1
+		s.bullets[0].move()
+		s.eggs[-1].drop()
+		s.invaders[0].lay()
+	assert fuzz.state(other) == fuzz.state(space)
+
+
+def test_games_are_the_same():
+	for seed in range(3):
+		runs = []
+		for engine in [None, ArraySpace]:
+			game = GameModel(engine)
+			game.initialize(9, 7, 14, seed)
+			result, _, steps, actions, states = game.run(local_search, headless=True)
+			runs.append((result, steps, list(actions), [s.tolist() for s in states]))
+		assert runs[0] == runs[1]
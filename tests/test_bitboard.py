@@ -0,0 +1,22 @@
+#
+#
+# engines.bitboard.BitSpace: same games as Model.Space on boards of at most 64 cells
+#
+#
+import pytest
+from engines import fuzz
+from engines.bitboard import BitSpace
+
+
+def test_bit_space_matches_space():
+	assert fuzz.fuzz(BitSpace, games=40) > 0
+
+
+def test_bit_space_matches_space_on_full_boards():
+	# 64 cells: the top bit of the integers is used
+	assert fuzz.fuzz(BitSpace, games=20, seed=100, sizes=[(8, 8), (16, 4), (4, 16)]) > 0
+
+
+def test_board_has_to_fit_in_64_bits():
+	with pytest.raises(ValueError):
+		BitSpace(9, 8)
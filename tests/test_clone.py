@@ -0,0 +1,45 @@
+#
+#
+# Space.clone: independent copies without copy.deepcopy
+#
+#
+import copy
+import pytest
+from engines import fuzz
+from engines.arrays import ArraySpace
+from engines.bitboard import BitSpace
+from engines.planes import PlaneSpace
+from engines.sparse import SparseSpace
+from helpers import ACTIONS, games, play_step
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('engine', [None, ArraySpace, BitSpace, PlaneSpace, SparseSpace])
+def test_clone_is_independent(engine, lazy):
+	for space, rnd in games(engine, count=10):
+		before = fuzz.state(space)
+		copy_ = space.clone(lazy=lazy)
+		assert fuzz.state(copy_) == before
+		play_step(copy_, rnd.choice(ACTIONS))
+		assert fuzz.state(space) == before
+
+
+def test_clone_plays_like_deepcopy():
+	for space, rnd in games(count=10, steps=20):
+		action = rnd.choice(ACTIONS)
+		deep, fast = copy.deepcopy(space), space.clone()
+		play_step(deep, action)
+		play_step(fast, action)
+		assert fuzz.state(fast) == fuzz.state(deep)
+
+
+def test_lazy_clone_builds_only_the_lists_it_uses():
+	for space, _ in games(count=5, steps=20):
+		new = space.clone(lazy=True)
+		assert set(new._pending) == {'invaders', 'eggs', 'bullets'}
+		new.spaceship.move('a')
+		assert set(new._pending) == {'invaders', 'eggs', 'bullets'}
+		new.update_egg()
+		assert 'eggs' not in new._pending
+		# a clone of the clone shares the coordinates it never used
+		assert new.clone(lazy=True)._pending['invaders'] is new._pending['invaders']
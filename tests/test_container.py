@@ -0,0 +1,60 @@
+#
+#
+# Multi-game container: index of games, lazy memory-mapped reads
+#
+#
+import os
+import numpy as np
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from records import container
+
+
+pytestmark = pytest.mark.usefixtures('workdir')
+
+
+def figures(seeds):
+	result = []
+	for seed in seeds:
+		game = GameModel()
+		game.initialize(9, 7, 14, seed)
+		game.run(local_search, headless=True)
+		result.append(np.asarray(game.getStatesStatistic()))
+	return result
+
+
+def test_archive_round_trip():
+	games = figures([0, 1, 2])
+	with container.ArchiveWriter('games', 9, 7, algorithm='local_search') as archive:
+		for seed, states in enumerate(games):
+			archive.write(states, result=True, steps=len(states) - 2, time=0.5, seed=seed)
+		archive.write(None, algorithm='greedy_bfs')
+	loaded = container.Archive('games')
+	assert len(loaded) == 4 and loaded.algorithms == ['local_search', 'greedy_bfs']
+	for seed, states in enumerate(games):
+		assert np.array_equal(loaded[seed], states)
+		assert not loaded[seed].flags.writeable
+		assert loaded.summary(seed) == {'result': True, 'steps': len(states) - 2, 'algorithm': 'local_search',
+				'seed': seed, 'time': 0.5}
+	assert len(loaded[3]) == 0 and loaded.summary(3)['result'] is None
+
+
+def test_convert_save_game():
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	evaluate = game.getEvaluate()
+	evaluate.evamultitime(local_search, 3, headless=True, seeds=[0, 1, 2])
+	evaluate.saveGame('games')
+	container.convert('games', 'local_search')
+	loaded = container.Archive('games')
+	for g, states in enumerate(figures([0, 1, 2])):
+		assert np.array_equal(loaded[g], states)
+
+
+def test_not_a_games_file():
+	os.makedirs('data')
+	with open('data/other.games', 'wb') as f:
+		f.write(b'\0' * 64)
+	with pytest.raises(ValueError):
+		container.Archive('other')
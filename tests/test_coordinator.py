@@ -0,0 +1,50 @@
+#
+#
+# Coordinator: games handed out to worker processes over local sockets
+#
+#
+from Model import GameModel
+from algorithms.HD import local_search
+from coordinator import Coordinator
+
+
+AUTHKEY = b'test'
+
+
+def failing(space):
+	# module-level: workers import the agent
+	raise RuntimeError('no decision')
+
+
+def evamultitime(seeds):
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	evaluate = game.getEvaluate()
+	_, lst_steps, _ = evaluate.evamultitime(local_search, len(seeds), headless=True, record=False, seeds=seeds)
+	return list(evaluate.getresults()), lst_steps
+
+
+def test_local_workers_play_the_games_of_evamultitime():
+	seeds = list(range(8))
+	with Coordinator(authkey=AUTHKEY) as coordinator:
+		coordinator.start_local_workers(3)
+		lst_time, lst_steps, lst_states = coordinator.evaluate(local_search, seeds)
+		assert (coordinator.results, lst_steps) == evamultitime(seeds)
+		assert len(lst_time) == len(lst_states) == 8 and coordinator.failures == {}
+		# the same workers go on with the next evaluation
+		_, lst_steps, _ = coordinator.evaluate(local_search, seeds[:3])
+		assert lst_steps == evamultitime(seeds[:3])[1]
+
+
+def test_failed_games_are_retried_then_reported():
+	with Coordinator(authkey=AUTHKEY, retries=1) as coordinator:
+		coordinator.start_local_workers(2)
+		lst_time, lst_steps, _ = coordinator.evaluate(failing, [0, 1])
+		assert lst_steps == [None, None] and coordinator.results == [None, None]
+		assert set(coordinator.failures) == {0, 1} and 'no decision' in coordinator.failures[0]
+
+
+def test_games_without_workers_are_played_here():
+	with Coordinator(authkey=AUTHKEY) as coordinator:
+		_, lst_steps, _ = coordinator.evaluate(local_search, [0, 1], deadline=0.2)
+		assert lst_steps == evamultitime([0, 1])[1]
@@ -0,0 +1,65 @@
+#
+#
+# Counters of Space: objects per column / row and lowest egg, kept up to date
+#
+#
+import numpy as np
+import pytest
+from engines.arrays import ArraySpace
+from engines.bitboard import BitSpace
+from engines.planes import PlaneSpace
+from engines.sparse import SparseSpace
+from helpers import ACTIONS, games
+
+
+def check_counters(space):
+	invaders, bullets = np.zeros(space.width, int), np.zeros(space.width, int)
+	eggs_col, eggs_row = np.zeros(space.width, int), np.zeros(space.height, int)
+	lowest = np.full(space.width, -1)
+	for o in space.invaders:
+		invaders[o.y] += 1
+	for o in space.bullets:
+		bullets[o.y] += 1
+	for o in space.eggs:
+		eggs_col[o.y] += 1
+		eggs_row[o.x] += 1
+		lowest[o.y] = max(lowest[o.y], o.x)
+	assert (space.invaders_per_column == invaders).all()
+	assert (space.bullets_per_column == bullets).all()
+	assert (space.eggs_per_column == eggs_col).all()
+	assert (space.eggs_per_row == eggs_row).all()
+	assert (space.lowest_egg == lowest).all()
+	figure = np.asarray(space.figure)
+	for value in [0, 1, 4, 7, 11]:
+		assert (space.cells_per_column(value) == (figure == value).sum(axis=0)).all()
+	assert (space.lone_invaders_per_column == (figure == 1).sum(axis=0)).all()
+	assert (space.lone_bullets_per_column == (figure == 7).sum(axis=0)).all()
+	assert (space.bullets_on_eggs_per_column == (figure == 11).sum(axis=0)).all()
+	for x in range(space.height):
+		for value in [0, 4, 11]:
+			assert space.cells_in_row(x, value) == np.flatnonzero(figure[x] == value).tolist()
+
+
+@pytest.mark.parametrize('engine', [None, ArraySpace, BitSpace, PlaneSpace, SparseSpace])
+def test_counters_follow_the_game(engine):
+	for space, rnd in games(engine):
+		check_counters(space)
+		records = [space.apply(rnd.choice(ACTIONS)), space.apply_invaders()]
+		check_counters(space)
+		for record in reversed(records):
+			space.undo(record)
+
+
+def test_counters_of_clones():
+	for space, rnd in games(count=10):
+		for lazy in [False, True]:
+			new = space.clone(lazy=lazy)
+			new.apply(rnd.choice(ACTIONS))
+			check_counters(new)
+			check_counters(space)
+
+
+def test_counters_are_read_only_copies():
+	for space, _ in games(count=1, steps=1):
+		space.invaders_per_column[:] = 0
+		assert space.invaders_per_column.sum() == len(space.invaders)
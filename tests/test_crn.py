@@ -0,0 +1,69 @@
+#
+#
+# Seeded random streams of Space and common random numbers across agents
+#
+#
+import numpy as np
+from Model import GameModel, Space
+from algorithms.HD import local_search
+from algorithms.LL import greedy_bfs
+from helpers import play_step
+
+
+def test_seed_fixes_the_layout():
+	layouts = []
+	for _ in range(2):
+		space = Space(9, 7)
+		space.seed(42)
+		space.initialize(14)
+		layouts.append([o.get_position() for o in space.invaders])
+	assert layouts[0] == layouts[1]
+
+
+def test_egg_draws_do_not_depend_on_the_agent():
+	# two agents, same seed: the invaders lay the same eggs as long as the same invaders act
+	spaces = []
+	for actions in [['a', 'remain'] * 2, ['d', 'remain'] * 2]:
+		space = Space(9, 7)
+		space.seed(7)
+		space.initialize(14)
+		for action in actions:
+			play_step(space, action)
+		spaces.append(space)
+	assert [o.get_position() for o in spaces[0].eggs] == [o.get_position() for o in spaces[1].eggs]
+
+
+def test_searches_do_not_change_the_game_draws():
+	space = Space(9, 7)
+	space.seed(3)
+	space.initialize(14)
+	space.step = 3
+	other = space.clone()
+	# the search samples eggs from the agent stream only
+	for _ in range(5):
+		space.undo(space.apply_invaders())
+	assert space.draw_laying(5) == other.draw_laying(5)
+
+
+def test_global_state_still_fixes_unseeded_games():
+	layouts = []
+	for _ in range(2):
+		np.random.seed(1)
+		space = Space(9, 7)
+		space.seed()
+		space.initialize(14)
+		layouts.append([o.get_position() for o in space.invaders])
+	assert layouts[0] == layouts[1]
+
+
+def test_evacompare_plays_the_same_games():
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	results = game.getEvaluate().evacompare([local_search, greedy_bfs], 3, seeds=[0, 1, 2], headless=True)
+	assert list(results) == ['local_search', 'greedy_bfs']
+	for algorithm in [local_search, greedy_bfs]:
+		alone = GameModel()
+		alone.initialize(9, 7, 14)
+		evaluate = alone.getEvaluate()
+		_, steps, _ = evaluate.evamultitime(algorithm, 3, headless=True, record=False, seeds=[0, 1, 2])
+		assert results[algorithm.__name__] == (list(evaluate.getresults()), steps)
@@ -0,0 +1,70 @@
+#
+#
+# Self-play datasets: sharded records, resumed after a crash, streamed back in batches
+#
+#
+import numpy as np
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from records import dataset
+
+
+pytestmark = pytest.mark.usefixtures('workdir')
+
+
+def records(name):
+	batches = list(dataset.load(name, batch_size=32))
+	return {field: np.concatenate([batch[field] for batch in batches]) for field in dataset.FIELDS}
+
+
+def test_dataset_round_trip():
+	manifest = dataset.generate('selfplay', local_search, seeds=range(3), shard_size=50)
+	assert manifest['complete'] and len(manifest['shards']) > 1
+	batches = list(dataset.load('selfplay', batch_size=32))
+	assert all(len(batch['action']) == 32 for batch in batches[:-1])
+	data = records('selfplay')
+	assert len(data['action']) == manifest['records']
+	# the first record of each game is its start, decided on by the algorithm
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	assert np.array_equal(data['state'][0], game.reset())
+	first = data['seed'] == 0
+	assert (data['step'][first] == np.arange(first.sum())).all()
+
+
+def test_resume_after_a_crash(monkeypatch):
+	dataset.generate('whole', local_search, seeds=range(4), shard_size=40)
+	expected = records('whole')
+	flush = dataset.ShardWriter.flush
+	calls = []
+
+	# a crash while writing the third shard
+	def crash(self, *args):
+		calls.append(1)
+		if len(calls) == 3:
+			raise KeyboardInterrupt
+		flush(self, *args)
+	monkeypatch.setattr(dataset.ShardWriter, 'flush', crash)
+	with pytest.raises(KeyboardInterrupt):
+		dataset.generate('resumed', local_search, seeds=range(4), shard_size=40)
+	assert not dataset.load_manifest('resumed')['complete']
+	monkeypatch.setattr(dataset.ShardWriter, 'flush', flush)
+	manifest = dataset.generate('resumed', local_search, seeds=range(4), shard_size=40)
+	assert manifest['complete']
+	for field in dataset.FIELDS:
+		assert np.array_equal(records('resumed')[field], expected[field])
+
+
+def test_other_settings_are_refused():
+	dataset.generate('selfplay', local_search, seeds=range(2))
+	with pytest.raises(ValueError):
+		dataset.generate('selfplay', local_search, seeds=range(3))
+
+
+def test_workers_write_the_same_records():
+	one = dataset.generate('one', local_search, seeds=range(4), shard_size=30)
+	many = dataset.generate('many', local_search, seeds=range(4), shard_size=30, workers=2)
+	assert one['records'] == many['records']
+	for field in dataset.FIELDS:
+		assert np.array_equal(records('one')[field], records('many')[field])
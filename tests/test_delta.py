@@ -0,0 +1,60 @@
+#
+#
+# Delta-encoded trajectories: keyframes every K steps, changed cells in between
+#
+#
+import os
+import pickle
+import numpy as np
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from records import delta
+
+
+pytestmark = pytest.mark.usefixtures('workdir')
+
+
+def figures(seeds):
+	result = []
+	for seed in seeds:
+		game = GameModel()
+		game.initialize(9, 7, 14, seed)
+		game.run(local_search, headless=True)
+		result.append(np.asarray(game.getStatesStatistic()))
+	return result
+
+
+def test_delta_round_trip():
+	games = figures([0, 1, 2])
+	delta.save('games', games, keyframe=4)
+	for g, states in enumerate(games):
+		reader = delta.DeltaReader('games', g)
+		assert reader.games == 3 and len(reader) == len(states)
+		# forward, then backward within and across keyframes
+		assert all(np.array_equal(reader[t], states[t]) for t in range(len(states)))
+		assert all(np.array_equal(reader[t], states[t]) for t in reversed(range(len(states))))
+		assert np.array_equal(reader[-1], states[-1])
+
+
+def test_reads_apply_at_most_k_deltas():
+	states = figures([0])[0]
+	arrays = delta.encode([states], keyframe=5)
+	assert (np.diff(arrays['keys']) == 5).all()
+	# only the changed cells are kept
+	changed = sum(np.count_nonzero(states[t] != states[t - 1]) for t in range(1, len(states)) if t % 5)
+	assert len(arrays['cells']) == changed
+
+
+def test_convert_pickles():
+	games = figures([0, 1])
+	os.makedirs('data')
+	with open('data/one.pickle', 'wb') as f:
+		pickle.dump(games[0], f)
+	with open('data/many_multi.pickle', 'wb') as f:
+		pickle.dump(games + [None], f)
+	delta.convert('one')
+	delta.convert('many')
+	assert np.array_equal(delta.DeltaReader('one')[-1], games[0][-1])
+	assert delta.DeltaReader('many').games == 2
+	assert np.array_equal(delta.DeltaReader('many', 1)[5], games[1][5])
@@ -0,0 +1,61 @@
+#
+#
+# Event bus of the game loop: events of GameModel, Space and the engines
+#
+#
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from engines import fuzz
+from events import EventBus
+
+
+def game_events(engine, seed):
+	game = GameModel(engine)
+	game.initialize(9, 7, 14, seed)
+	current, log = [0], []
+	game.events.subscribe('step_start', lambda step: current.__setitem__(0, step))
+	for event in fuzz.GAME_EVENTS:
+		game.events.subscribe(event, lambda x, y, event=event: log.append((current[0], event, x, y)))
+	result, _, steps, actions, _ = game.run(local_search, headless=True, record=False)
+	return result, steps, list(actions), sorted(log)
+
+
+@pytest.mark.parametrize('path', fuzz.ENGINES)
+def test_engine_games_publish_the_same_events(path):
+	for seed in range(3):
+		assert game_events(fuzz.load(path), seed) == game_events(None, seed)
+
+
+def test_game_loop_events():
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	log = []
+	for event in ['game_start', 'step_start', 'action_chosen', 'step_end', 'game_over']:
+		game.events.subscribe(event, lambda event=event, **data: log.append((event, data)))
+	result, _, steps, actions, _ = game.run(local_search, headless=True)
+	names = [event for event, _ in log]
+	assert names[0] == 'game_start' and names[-1] == 'game_over'
+	assert names.count('step_start') == names.count('action_chosen') == steps + 1
+	assert [data['action'] for event, data in log if event == 'action_chosen'] == list(actions)
+	assert log[-1][1]['result'] == result and log[-1][1]['steps'] == steps + 1
+
+
+def test_searches_publish_nothing():
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	hits = []
+	game.events.subscribe('bullet_hit', lambda x, y: hits.append((x, y)))
+	game.run(local_search, headless=True, record=False)
+	# only the invaders really shot down, not those of the moves tried by the search
+	assert len(hits) == 14 - len(game.getSpace().invaders)
+
+
+def test_subscriptions():
+	bus = EventBus()
+	with pytest.raises(ValueError):
+		bus.subscribe('no_such_event', print)
+	callback = bus.subscribe('egg_laid', lambda x, y: None)
+	assert 'egg_laid' in bus and 'egg_broken' not in bus
+	bus.unsubscribe('egg_laid', callback)
+	assert 'egg_laid' not in bus
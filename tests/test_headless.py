@@ -0,0 +1,43 @@
+#
+#
+# Headless runs: no console output, optional recording, steps per second
+#
+#
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from exception import GameNotRun
+
+
+def test_headless_run_prints_nothing(capsys):
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	result, time, steps, actions, states = game.run(local_search, headless=True)
+	assert capsys.readouterr().out == ''
+	assert len(actions) == steps + 1 and len(states) == steps + 2
+	assert game.getEvaluate().getspeed() > 0
+
+
+def test_run_without_record_keeps_no_states(capsys):
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	game.run(local_search, headless=True, record=False)
+	with pytest.raises(GameNotRun):
+		game.getStatesStatistic()
+
+
+def test_console_run_prints_the_game(capsys):
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	game.run(local_search)
+	assert 'Start algorithm' in capsys.readouterr().out
+
+
+def test_headless_evaluation(capsys):
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	evaluate = game.getEvaluate()
+	lst_time, lst_steps, states = evaluate.evamultitime(local_search, 3, headless=True, record=False, seeds=[0, 1, 2])
+	assert capsys.readouterr().out == ''
+	assert len(lst_time) == len(lst_steps) == 3 and not any(len(s) for s in states)
+	assert evaluate.getspeed() > 0
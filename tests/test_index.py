@@ -0,0 +1,45 @@
+#
+#
+# Cell index of Space: what is on a cell, kept up to date as objects move and die
+#
+#
+from helpers import ACTIONS, games
+
+
+def cells(space):
+	"""
+	(x, y) -> ids of the objects on that cell, from the object lists
+	"""
+	result = {}
+	for obj in [space.spaceship] + space.invaders + space.eggs + space.bullets:
+		result.setdefault((obj.x, obj.y), set()).add(id(obj))
+	return result
+
+
+def test_index_follows_the_objects():
+	for space, rnd in games():
+		assert {cell: {id(o) for o in objects} for cell, objects in space._index().items()} == cells(space)
+		records = [space.apply(rnd.choice(ACTIONS)), space.apply_invaders()]
+		assert {cell: {id(o) for o in objects} for cell, objects in space._index().items()} == cells(space)
+		for record in reversed(records):
+			space.undo(record)
+
+
+def test_at_and_check_losing():
+	for space, _ in games(count=10):
+		for x in range(space.height):
+			for y in range(space.width):
+				objects = [o for o in [space.spaceship] + space.invaders + space.eggs + space.bullets
+						if o.get_position() == (x, y)]
+				assert sorted(map(id, space.at(x, y))) == sorted(map(id, objects))
+				assert [o.label for o in space.at(x, y, 'Egg')] == ['Egg'] * sum(o.label == 'Egg' for o in objects)
+		ship = space.spaceship
+		assert space.check_losing() == any(egg.get_position() == ship.get_position() for egg in space.eggs)
+
+
+def test_lazy_clone_builds_its_index():
+	for space, _ in games(count=5):
+		new = space.clone(lazy=True)
+		assert new._cells is None
+		assert new.spaceship in new.at(*new.spaceship.get_position())
+		assert {cell: {id(o) for o in objects} for cell, objects in new._index().items()} == cells(new)
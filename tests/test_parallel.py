@@ -0,0 +1,46 @@
+#
+#
+# evamultitime over a process pool: the games of a sequential run, in game order
+#
+#
+import numpy as np
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from algorithms.QD import expectimax_getaction
+from exception import GameAlreadyRun
+
+
+def evaluate(workers, seeds=range(6), algorithm=local_search, maxdepth=None, maxrandom=None):
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	evaluate = game.getEvaluate()
+	lst_time, lst_steps, states = evaluate.evamultitime(algorithm, len(seeds), maxdepth, maxrandom, headless=True, workers=workers,
+			seeds=list(seeds))
+	return list(evaluate.getresults()), lst_steps, [np.asarray(s).tolist() for s in states]
+
+
+def test_workers_give_the_results_of_one_process():
+	assert evaluate(3) == evaluate(1)
+
+
+def test_workers_give_the_results_of_one_process_with_search_draws():
+	# expectimax draws from the agent stream of each game
+	assert evaluate(2, range(2), expectimax_getaction, 2, 2) == evaluate(1, range(2), expectimax_getaction, 2, 2)
+
+
+def test_more_workers_than_games():
+	results, steps, states = evaluate(8, seeds=[4, 5])
+	assert len(results) == len(steps) == len(states) == 2
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_evaluated_game_has_to_be_reinitialized(workers):
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	evaluate = game.getEvaluate()
+	evaluate.evamultitime(local_search, 2, headless=True, workers=workers, seeds=[0, 1])
+	with pytest.raises(GameAlreadyRun):
+		evaluate.evamultitime(local_search, 2, headless=True, workers=workers, seeds=[0, 1])
+	game.reinitialize()
+	evaluate.evamultitime(local_search, 2, headless=True, workers=workers, seeds=[0, 1])
@@ -0,0 +1,38 @@
+#
+#
+# engines.planes.PlaneSpace: same games as Model.Space, one boolean plane per kind of object
+#
+#
+import numpy as np
+from algorithms.HD import heuristic
+from engines import fuzz
+from engines.planes import PlaneSpace, decode, encode
+from helpers import games
+
+
+def test_plane_space_matches_space():
+	assert fuzz.fuzz(PlaneSpace, games=40) > 0
+
+
+def test_plane_space_matches_space_on_big_boards():
+	assert fuzz.fuzz(PlaneSpace, games=5, sizes=[(30, 40), (12, 70)]) > 0
+
+
+def test_figure_encodes_the_planes():
+	for space, _ in games(count=10):
+		figure = np.asarray(space.figure)
+		assert np.array_equal(encode(decode(figure)), figure)
+		assert np.array_equal(PlaneSpace.from_space(space).planes, decode(figure))
+
+
+def no_figure(space):
+	raise AssertionError('figure built')
+
+
+def test_heuristic_reads_no_figure(monkeypatch):
+	for space, _ in games(count=10):
+		planes = PlaneSpace.from_space(space)
+		expected = [heuristic(space, act) for act in ['w', 'a', 'd', 'remain']]
+		monkeypatch.setattr(PlaneSpace, 'figure', property(no_figure))
+		assert [heuristic(planes, act) for act in ['w', 'a', 'd', 'remain']] == expected
+		monkeypatch.undo()
@@ -0,0 +1,44 @@
+#
+#
+# Pooled bullets and eggs: O(1) removal, released objects reused, creation order kept
+#
+#
+from Model import Bullet, Egg, Pooled
+from helpers import ACTIONS, games, play_step
+
+
+def test_undo_keeps_objects_and_pools():
+	for space, rnd in games():
+		eggs, bullets = list(space.eggs), list(space.bullets)
+		records = [space.apply(rnd.choice(ACTIONS)), space.apply_invaders(), space.apply('w', newstep=True)]
+		for record in reversed(records):
+			space.undo(record)
+		# the same objects, in creation order, and none of them in a free-list
+		assert [id(o) for o in space.eggs] == [id(o) for o in eggs]
+		assert [id(o) for o in space.bullets] == [id(o) for o in bullets]
+		free = [id(o) for objects in space._free.values() for o in objects]
+		assert len(free) == len(set(free))
+		assert not set(free) & {id(o) for o in space.eggs + space.bullets}
+		assert space._open == 0
+		assert all(o.index == i for objects in (space.eggs, space.bullets) for i, o in enumerate(objects))
+
+
+def test_released_objects_are_reused(monkeypatch):
+	created, spawned = [], []
+	for cls in [Bullet, Egg]:
+		monkeypatch.setattr(cls, '__init__', lambda self, *args, init=cls.__init__, **kwargs:
+				created.append(self) or init(self, *args, **kwargs))
+	spawn = Pooled.spawn.__func__
+	monkeypatch.setattr(Pooled, 'spawn', classmethod(lambda cls, *args: spawned.append(cls) or spawn(cls, *args)))
+	for space, rnd in games(count=5, steps=300):
+		pass
+	# objects are only created when none is free
+	assert 0 < len(created) < len(spawned)
+
+
+def test_removed_objects_leave_in_order():
+	for space, rnd in games(count=10):
+		order = {id(o): i for i, o in enumerate(space.eggs)}
+		play_step(space, rnd.choice(ACTIONS))
+		kept = [order[id(o)] for o in space.eggs if id(o) in order]
+		assert kept == sorted(kept)
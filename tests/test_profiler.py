@@ -0,0 +1,42 @@
+#
+#
+# Profiler: per-phase timings of the game loop, exported as JSON
+#
+#
+import json
+from Model import GameModel
+from algorithms.HD import local_search
+from profiler import Profiler
+
+
+def test_phases_of_every_step():
+	profiler = Profiler()
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	result, _, steps, _, _ = game.run(local_search, headless=True, profiler=profiler)
+	timings = profiler.games[0]
+	# every step decides, moves and drops eggs, the last one may stop before the invaders act
+	for phase in ['update_bullet', 'algorithm', 'move', 'update_egg', 'check_losing']:
+		assert len(timings[phase]) == steps + 1
+	assert steps <= len(timings['invader_actions']) <= steps + 1
+	assert all(d >= 0 for durations in timings.values() for d in durations)
+
+
+def test_json_export(tmp_path):
+	profiler = Profiler()
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	game.getEvaluate().evamultitime(local_search, 2, headless=True, record=False, seeds=[0, 1], profiler=profiler)
+	path = tmp_path / 'profile.json'
+	text = profiler.to_json(str(path))
+	report = json.loads(path.read_text())
+	assert json.loads(text) == report
+	assert report['unit'] == 'us' and len(report['games']) == 2
+	algorithm = report['run']['algorithm']
+	assert algorithm['count'] == sum(game['algorithm']['count'] for game in report['games'])
+	assert algorithm['p50'] <= algorithm['p95'] <= algorithm['p99'] <= algorithm['max']
+	assert sum(algorithm['histogram']['counts']) == algorithm['count']
+
+
+def test_stats_of_no_durations():
+	assert Profiler.stats([]) == {'count': 0}
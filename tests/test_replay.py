@@ -0,0 +1,57 @@
+#
+#
+# Replays: games rebuilt from board, seed and actions
+#
+#
+import os
+import numpy as np
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from records import replay
+
+
+pytestmark = pytest.mark.usefixtures('workdir')
+
+
+def play(seed):
+	game = GameModel()
+	game.initialize(9, 7, 14, seed)
+	game.run(local_search, headless=True)
+	return game
+
+
+def test_replay_round_trip():
+	game = play(4)
+	states = np.asarray(game.getStatesStatistic())
+	path = replay.Replay.from_game(game).save('game')
+	assert os.path.getsize(path) < 1000
+	loaded = replay.Replay.load('game')
+	loaded.checkpoint = 4
+	assert loaded.verify()
+	assert len(loaded) == len(game.getActionsStatistic()) + 1
+	# run records the start, then the figure after each step
+	assert np.array_equal(loaded[0], states[0]) and np.array_equal(loaded[-1], states[-1])
+	# backward jumps start again from a checkpoint
+	assert all(np.array_equal(loaded[t], states[t]) for t in reversed(range(len(loaded))))
+
+
+def test_verify_finds_other_games():
+	loaded = replay.Replay.from_game(play(4))
+	# one action short: the game is not over yet
+	short = replay.Replay(loaded.height, loaded.width, loaded.num, loaded.seed, loaded.actions[:-1], loaded.result,
+			loaded.final)
+	assert not short.verify()
+	other = replay.Replay(loaded.height, loaded.width, loaded.num, loaded.seed + 1, loaded.actions, loaded.result,
+			loaded.final)
+	assert not other.verify()
+
+
+def test_replay_of_a_stepped_game():
+	game = GameModel()
+	game.initialize(9, 7, 14, 2)
+	game.reset()
+	done = False
+	while not done:
+		_, _, done, _ = game.step(local_search(game.getSpace()))
+	assert replay.Replay.from_game(game).verify()
@@ -0,0 +1,56 @@
+#
+#
+# evasequential: games until the confidence intervals are narrow enough, or a budget
+#
+#
+from Model import Evaluate, GameModel
+from algorithms.HD import local_search
+
+
+def sequential(**kwargs):
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	return game.getEvaluate().evasequential(local_search, headless=True, seeds=range(100), **kwargs)
+
+
+def test_wide_targets_stop_at_the_first_test():
+	report = sequential(win_width=1.0, steps_width=1000.0, min_games=4)
+	assert report['stop'] == 'converged' and report['games'] == 4
+
+
+def test_game_budget():
+	report = sequential(win_width=0.0, steps_width=0.0, max_games=7)
+	assert report['stop'] == 'max_games' and report['games'] == 7
+	low, high = report['win_interval']
+	assert low <= report['win_rate'] <= high
+	low, high = report['steps_interval']
+	assert low <= report['mean_steps'] <= high
+
+
+def test_time_budget():
+	report = sequential(win_width=0.0, steps_width=0.0, max_time=0.0)
+	assert report['stop'] == 'max_time' and report['games'] == 1
+
+
+def test_stops_where_the_intervals_are_narrow_enough():
+	report = sequential(win_width=0.5, steps_width=10.0, min_games=2)
+	lst_result, lst_steps = [], []
+	for seed in range(report['games']):
+		game = GameModel()
+		game.initialize(9, 7, 14, seed)
+		result, _, steps, _, _ = game.run(local_search, headless=True, record=False)
+		lst_result.append(result)
+		lst_steps.append(steps)
+	# the intervals of one game less were too wide
+	assert report['stop'] == 'converged'
+	win, mean = Evaluate.intervals(lst_result, lst_steps)
+	assert (win, mean) == (report['win_interval'], report['steps_interval'])
+	if report['games'] > 2:
+		win, mean = Evaluate.intervals(lst_result[:-1], lst_steps[:-1])
+		assert win[1] - win[0] > 0.5 or mean[1] - mean[0] > 10.0
+
+
+def test_workers_play_the_same_games():
+	one = sequential(win_width=0.0, steps_width=0.0, max_games=6)
+	many = sequential(win_width=0.0, steps_width=0.0, max_games=6, workers=3)
+	assert one == many
@@ -0,0 +1,65 @@
+#
+#
+# engines.sparse.SparseSpace: same games as Model.Space, no dense matrix unless figure is read
+#
+#
+from Model import GameModel, Space
+from algorithms.HD import local_search
+from algorithms.LL import greedy_bfs
+from engines import fuzz
+from engines.sparse import SparseSpace
+from helpers import ACTIONS, play_step
+
+
+def test_sparse_space_matches_space():
+	assert fuzz.fuzz(SparseSpace, games=40) > 0
+
+
+def test_sparse_queries_match_space():
+	space = Space(9, 7)
+	space.seed(3)
+	space.initialize(14)
+	sparse = SparseSpace.from_space(space)
+	for action in ['w', 'a', 'w', 'd', 'w', 'remain'] * 3:
+		for s in [space, sparse]:
+			play_step(s, action)
+		for value in range(16):
+			assert (space.cells_per_column(value) == sparse.cells_per_column(value)).all()
+			for x in range(9):
+				assert space.cells_in_row(x, value) == sparse.cells_in_row(x, value)
+		for x in range(9):
+			for y in range(7):
+				assert isinstance(sparse.at(x, y), tuple)
+				assert sorted((o.label, o.get_position()) for o in space.at(x, y)) == \
+						sorted((o.label, o.get_position()) for o in sparse.at(x, y))
+				assert len(space.at(x, y, 'Egg')) == len(sparse.at(x, y, 'Egg'))
+
+
+def count_figures(monkeypatch):
+	"""
+	return the list getting an item every time a SparseSpace figure is built
+	"""
+	builds = []
+	figure = SparseSpace.figure.fget
+	monkeypatch.setattr(SparseSpace, 'figure', property(lambda self: builds.append(1) or figure(self)))
+	return builds
+
+
+def test_sparse_space_without_observation_builds_no_figure(monkeypatch):
+	builds = count_figures(monkeypatch)
+	game = GameModel(SparseSpace, observe=False)
+	game.initialize(200, 200, 20, 1)
+	assert game.reset() is None
+	for step in range(10):
+		_, _, done, _ = game.step(ACTIONS[step % 4])
+		if done:
+			break
+	assert not builds
+	# the agents read the space through its queries too
+	for step in range(5):
+		local_search(game.getSpace())
+		greedy_bfs(game.getSpace())
+		_, _, done, _ = game.step(local_search(game.getSpace()))
+		if done:
+			break
+	assert not builds
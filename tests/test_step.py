@@ -0,0 +1,65 @@
+#
+#
+# reset / step: a game driven one action at a time, with read-only observations
+#
+#
+import numpy as np
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from exception import GameNotRun
+
+
+def test_step_plays_the_game_of_run():
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	result, _, steps, actions, states = game.run(local_search, headless=True)
+	actions, states = list(actions), np.asarray(states)
+
+	game.reset(0)
+	total, done, t = 0, False, 0
+	while not done:
+		observation, reward, done, info = game.step(actions[t])
+		t += 1
+		total += reward
+	assert t == len(actions) and info['result'] == result
+	assert np.array_equal(observation, states[-1])
+	assert total == 14 - len(game.getSpace().invaders)
+
+
+def test_step_info():
+	game = GameModel()
+	game.initialize(9, 7, 14, 3)
+	game.reset()
+	done = False
+	while not done:
+		_, _, done, info = game.step(local_search(game.getSpace()))
+		assert info['step'] == len(game.getActionsStatistic())
+		assert (info['result'] is None) != done
+
+
+def test_observation_is_a_read_only_view():
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	observation = game.reset()
+	assert not observation.flags.writeable
+	with pytest.raises(ValueError):
+		observation[0, 0] = 3
+	# not a copy: it follows the game
+	game.step('w')
+	assert np.array_equal(observation, game.getSpace().figure)
+
+
+def test_step_needs_a_game():
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	with pytest.raises(GameNotRun):
+		game.step('w')
+	game.reset()
+	done = False
+	while not done:
+		_, _, done, _ = game.step(local_search(game.getSpace()))
+	with pytest.raises(GameNotRun):
+		game.step('w')
+	# reset without a seed after a game starts a new one
+	assert game.reset() is not None
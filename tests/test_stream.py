@@ -0,0 +1,47 @@
+#
+#
+# Streaming sinks of evamultitime: every game written when it ends, a few kept in memory
+#
+#
+import numpy as np
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from records import container, stream
+
+
+pytestmark = pytest.mark.usefixtures('workdir')
+
+
+def test_stream_writes_every_game():
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	with stream.GameStream('games', keep=2) as sink:
+		lst_time, lst_steps, states = game.getEvaluate().evamultitime(local_search, 4, headless=True,
+				seeds=[0, 1, 2, 3], sink=sink)
+	# evamultitime keeps nothing itself
+	assert game.getEvaluate()._states == []
+	assert len(states) == 2 and all(np.asarray(s).shape[1:] == (9, 7) for s in states)
+	saved = list(stream.read_games('games'))
+	assert [g['seed'] for g in saved] == [0, 1, 2, 3]
+	assert [g['steps'] for g in saved] == lst_steps and [g['time'] for g in saved] == lst_time
+	assert all(type(g['states']) is np.ndarray for g in saved)
+	assert np.array_equal(saved[-1]['states'], states[-1])
+
+
+def test_append_goes_on_with_the_file():
+	for seeds in [[0], [1, 2]]:
+		game = GameModel()
+		game.initialize(9, 7, 14)
+		with stream.GameStream('games', append=True) as sink:
+			game.getEvaluate().evamultitime(local_search, len(seeds), headless=True, seeds=seeds, sink=sink)
+	assert [g['seed'] for g in stream.read_games('games')] == [0, 1, 2]
+
+
+def test_archive_is_a_sink():
+	game = GameModel()
+	game.initialize(9, 7, 14)
+	with container.ArchiveWriter('games', 9, 7, 'local_search', keep=2) as sink:
+		_, _, states = game.getEvaluate().evamultitime(local_search, 3, headless=True, seeds=[0, 1, 2], sink=sink)
+	assert len(states) == 2
+	assert np.array_equal(container.Archive('games')[2], states[-1])
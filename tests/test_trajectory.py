@@ -0,0 +1,42 @@
+#
+#
+# Trajectory: figures of a game in one growable int8 array, saved as .npy
+#
+#
+import pickle
+import numpy as np
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from records import trajectory
+
+
+def test_trajectory_grows():
+	for capacity in [0, 1, 64]:
+		states = trajectory.Trajectory(3, 2, capacity=capacity)
+		for i in range(100):
+			states.append(np.full((3, 2), i % 16))
+		assert len(states) == 100 and states[99].tolist() == [[3, 3]] * 3
+		assert np.asarray(states).dtype == np.int8
+
+
+def test_trajectory_pickles_without_its_free_end():
+	states = trajectory.Trajectory(3, 2)
+	states.append(np.ones((3, 2)))
+	copy = pickle.loads(pickle.dumps(states))
+	assert len(copy._data) == 1 and np.array_equal(np.asarray(copy), np.asarray(states))
+	empty = pickle.loads(pickle.dumps(trajectory.Trajectory(3, 2)))
+	empty.append(np.ones((3, 2)))
+	assert np.asarray(empty).shape == (1, 3, 2)
+
+
+@pytest.mark.usefixtures('workdir')
+def test_save_load():
+	game = GameModel()
+	game.initialize(9, 7, 14, 0)
+	game.run(local_search, headless=True)
+	game.saveData('game')
+	loaded = trajectory.load('game')
+	assert isinstance(loaded, np.memmap) and loaded.dtype == np.int8
+	assert np.array_equal(loaded, np.asarray(game.getStatesStatistic()))
+	assert not isinstance(trajectory.load('game', mmap=False), np.memmap)
@@ -0,0 +1,49 @@
+#
+#
+# apply / undo: searches play moves in place and take them back exactly
+#
+#
+import pytest
+from Model import Space
+from algorithms.HD import local_search
+from algorithms.LL import greedy_bfs
+from algorithms.QD import expectimax_getaction
+from engines import fuzz
+from engines.arrays import ArraySpace
+from engines.bitboard import BitSpace
+from engines.planes import PlaneSpace
+from engines.sparse import SparseSpace
+from helpers import ACTIONS, games
+
+
+@pytest.mark.parametrize('engine', [None, ArraySpace, BitSpace, PlaneSpace, SparseSpace])
+def test_apply_undo_round_trip(engine):
+	for space, rnd in games(engine):
+		before = fuzz.state(space)
+		records = []
+		for depth in range(3):
+			records.append(space.apply(rnd.choice(ACTIONS), newstep=bool(depth)))
+			records.append(space.apply_invaders())
+		for record in reversed(records):
+			space.undo(record)
+		assert fuzz.state(space) == before
+
+
+def test_apply_plays_a_turn():
+	for space, rnd in games(count=10):
+		action = rnd.choice(ACTIONS)
+		other = space.clone()
+		other.step += 1
+		other.update_bullet()
+		other.spaceship.move(action)
+		other.update_egg()
+		space.apply(action, newstep=True)
+		assert fuzz.state(space) == fuzz.state(other)
+
+
+@pytest.mark.parametrize('algorithm, args', [(local_search, ()), (greedy_bfs, ()), (expectimax_getaction, (2, 2))])
+def test_searches_leave_the_space_unchanged(algorithm, args):
+	for space, _ in games(count=4, steps=15):
+		before = fuzz.state(space)
+		algorithm(space, *args)
+		assert fuzz.state(space) == before
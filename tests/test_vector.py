@@ -0,0 +1,37 @@
+#
+#
+# engines.vector.VectorSpace: N games in lockstep, each one the game of Model.Space
+#
+#
+import numpy as np
+import pytest
+from engines import fuzz
+from engines.vector import VectorSpace
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_vector_space_matches_space(seed):
+	assert fuzz.fuzz_batched(VectorSpace, games=40, seed=seed) > 0
+
+
+def test_vector_space_actions():
+	vector = VectorSpace(3, 9, 7, 14, seed=0)
+	vector.step(['left', None, 'shoot'])
+	# shooting takes the shot, doing nothing keeps it, moving gets it back
+	assert vector.available.tolist() == [True, True, False]
+	vector.step(np.array([1, 2, 2]))
+	assert vector.available.tolist() == [True, False, True]
+
+
+def test_ended_games_start_again():
+	vector = VectorSpace(16, 9, 7, 14, seed=0)
+	rng = np.random.default_rng(0)
+	ended = 0
+	for _ in range(300):
+		_, done, win, steps = vector.step(rng.integers(0, 4, size=16))
+		ended += done.sum()
+		# restarted games are at their first decision again
+		assert (vector.turn[done] == 0).all()
+		assert (vector.planes[done, 0].sum(axis=(1, 2)) == 14).all()
+		assert (steps[done] > 0).all() and not (win & ~done).any()
+	assert ended > 0
@@ -0,0 +1,49 @@
+#
+#
+# Watchdog: seeded games replay identically with a deadline, stuck agents fall back
+#
+#
+import time
+import pytest
+from Model import GameModel
+from algorithms.HD import local_search
+from algorithms.QD import expectimax_getaction
+from exception import DecisionTimeout
+from records.replay import Replay
+
+
+def stuck_sometimes(space):
+	# module-level: the watchdog sends the agent to its worker
+	if space.step in (4, 11):
+		time.sleep(100)
+	return local_search(space)
+
+
+def play(seed, algorithm, *args, **kwargs):
+	game = GameModel()
+	game.initialize(9, 7, 14, seed)
+	result, _, steps, actions, _ = game.run(algorithm, *args, headless=True, **kwargs)
+	return game, (result, steps, list(actions))
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_seeded_game_is_the_same_under_the_watchdog(seed):
+	# expectimax draws from the agent stream: the worker's draws go on in the game
+	_, untimed = play(seed, expectimax_getaction, 2, 2)
+	game, timed = play(seed, expectimax_getaction, 2, 2, timeout=60)
+	assert timed == untimed
+	assert game.getTimeoutsStatistic() == []
+	assert Replay.from_game(game).verify()
+
+
+def test_stuck_agent_plays_the_fallback():
+	game, (result, steps, actions) = play(5, stuck_sometimes, timeout=1.0, fallback='remain')
+	assert game.getTimeoutsStatistic() == [4, 11]
+	# space.step counts from 0: step t is action t
+	assert actions[4] == actions[11] == 'remain'
+	assert Replay.from_game(game).verify()
+
+
+def test_stuck_agent_without_fallback_raises():
+	with pytest.raises(DecisionTimeout):
+		play(5, stuck_sometimes, timeout=1.0, fallback=None)
@@ -1,15 +1,14 @@
 #
 #
-# Visualize the game by get input as pickle file
+# Visualize the game by get input as .npy (or older pickle) file
 # For more information, you can go to README.md
 #
 #
 import pygame
 import os
-import copy
 import pickle
-import numpy as np
 from Model import GameModel
+from records import trajectory, delta, container
 
 
 def online_play(game: 'GameModel'):
@@ -128,9 +127,7 @@ def online_play(game: 'GameModel'):
 
         if step % 3 == 1:
             if len(acting_possible_invaders):
-                new_egg_number = np.random.randint(1, min([4, 1 + len(acting_possible_invaders)]))
-                laying_invader = sorted(np.random.choice(
-                    range(len(acting_possible_invaders)), new_egg_number, replace=False))
+                laying_invader = space.draw_laying(len(acting_possible_invaders), space.egg_rng(step))
                 for i in laying_invader:
                     acting_possible_invaders[i].lay()
             else:
@@ -141,7 +138,7 @@ def online_play(game: 'GameModel'):
     playback_step = 0
     run = True
     finish = False
-    game._states.append(copy.deepcopy(space.figure))
+    game._states.append(space.figure)
     FPS = 60
     clock = pygame.time.Clock()
     while run:
@@ -172,8 +169,9 @@ def online_play(game: 'GameModel'):
                     print(f'Step {current_step}: ' + n)
                     environment_changes(space, current_step)
                     ship.move(n)
-                    game._states.append(copy.deepcopy(space.figure))
+                    game._states.append(space.figure)
                     if space.check_collision():
+                        print(f'collision occurs at x= {ship.x} , y ={ship.y}')
                         finish = True
                     if space.check_winning():
                         print('Winning')
@@ -196,11 +194,19 @@ def online_play(game: 'GameModel'):
     pygame.quit()
 
 
-def visualize_play(filename):
+def visualize_play(filename, game=0):
 
-    # Get input file
-    with open(os.path.join('data', f'{filename}.pickle'), 'rb') as f:
-        list_data = pickle.load(f)
+    # Get input file: memory-mapped .npy of saveData, delta file (records.delta),
+    # game number <game> of a games file (records.container), else pickle of older versions
+    if os.path.exists(os.path.join('data', f'{filename}.npy')):
+        list_data = trajectory.load(filename)
+    elif os.path.exists(os.path.join('data', f'{filename}.delta.npz')):
+        list_data = delta.DeltaReader(filename, game)
+    elif os.path.exists(os.path.join('data', f'{filename}.games')):
+        list_data = container.Archive(filename)[game]
+    else:
+        with open(os.path.join('data', f'{filename}.pickle'), 'rb') as f:
+            list_data = pickle.load(f)
     
     # list_data = list_data[1]
         
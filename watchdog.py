@@ -0,0 +1,87 @@
+#
+#
+# Per-decision deadline: the agent runs in a supervised worker process,
+# which is killed when it does not answer in time (e.g. a search that never ends).
+#
+#
+import multiprocessing
+from exception import DecisionTimeout
+
+
+def _serve(conn):
+	"""
+	Worker loop: call the agents sent by Watchdog.decide and send their actions back,
+	with the state of the agent stream (space.agent_rng) after the draws of the agent
+	"""
+	while True:
+		try:
+			algorithm, space, args = conn.recv()
+		except EOFError:
+			return
+		try:
+			action = algorithm(space, *args)
+			conn.send((True, (action, space.agent_rng.bit_generator.state)))
+		except Exception as error:
+			conn.send((False, error))
+
+
+class Watchdog(object):
+	"""
+	Ask the agent for an action within <timeout> seconds
+		fallback: action played on timeout (None: raise DecisionTimeout)
+		timeouts: (list) steps of the decisions that timed out
+	The agent and the space are sent to the worker: the agent has to be a module-level function.
+	The agent stream of the space goes on from the worker's draws, so a game played with a watchdog
+	is the game played without one, as long as no decision times out (a timed-out decision draws nothing).
+	Usage:
+		with Watchdog(1.0) as watchdog:
+			action = watchdog.decide(greedy_bfs, space)
+	"""
+	def __init__(self, timeout: float, fallback: str = 'remain'):
+		self.timeout = timeout
+		self.fallback = fallback
+		self.timeouts = []
+		self._process = None
+		self._conn = None
+
+	def _start(self):
+		self._conn, child = multiprocessing.Pipe()
+		self._process = multiprocessing.Process(target=_serve, args=(child,), daemon=True)
+		self._process.start()
+		child.close()
+
+	def decide(self, algorithm, space, *args):
+		"""
+		return algorithm(space, *args), or fallback if it takes more than timeout seconds
+		"""
+		if self._process is None:
+			self._start()
+		# a copy: no event bus to send, and the agent may change it
+		self._conn.send((algorithm, space.clone(), args))
+		if self._conn.poll(self.timeout):
+			ok, answer = self._conn.recv()
+			if not ok:
+				raise answer
+			action, state = answer
+			space.agent_rng.bit_generator.state = state
+			return action
+		# the agent is stuck: kill it, the next decision starts a new worker
+		self.stop()
+		self.timeouts.append(space.step)
+		if self.fallback is None:
+			raise DecisionTimeout(f'No decision within {self.timeout} seconds at step {space.step}.')
+		return self.fallback
+
+	def stop(self):
+		if self._process is not None:
+			self._process.kill()
+			self._process.join()
+			self._conn.close()
+			self._process = None
+			self._conn = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.stop()